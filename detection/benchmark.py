@@ -0,0 +1,367 @@
+import argparse
+import contextlib
+import os
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import face
+from sources import VideoFileSource, AudioFileSource
+
+
+DEFAULT_SCALES = [1.0, 0.75, 0.5, 0.33, 0.25]
+AUDIO_FORMATS = [(44100, "float64"), (44100, "float32"), (16000, "float32"), (16000, "int16")]
+
+
+# ---------------------------------------------------------
+# FACE: DETECTION RESOLUTION
+# ---------------------------------------------------------
+
+def grab_frames(video=None, image=None, count=100):
+    """Collects `count` frames up front so disk/camera time is not measured."""
+    if image:
+        frame = cv2.imread(image)
+        if frame is None:
+            raise SystemExit(f"❌ Could not read image: {image}")
+        return [frame] * count
+
+    cap = cv2.VideoCapture(video if video else 0)
+    if not video:
+        cap.set(3, 1280)
+        cap.set(4, 720)
+
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+
+    if not frames:
+        raise SystemExit("❌ No frames captured")
+    return frames
+
+
+def bench_scales(frames, scales=DEFAULT_SCALES):
+    """CPU time per frame of cvtColor/equalizeHist/detectMultiScale at each scale."""
+    results = []
+    for scale in scales:
+        faces_found = 0
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        for frame in frames:
+            faces_found += len(face.detect_faces(frame, scale))
+        cpu = time.process_time() - cpu0
+        wall = time.perf_counter() - wall0
+        results.append({
+            "scale": scale,
+            "cpu_ms": cpu / len(frames) * 1000,
+            "wall_ms": wall / len(frames) * 1000,
+            "faces": faces_found,
+        })
+    return results
+
+
+def print_scale_table(results, frames):
+    h, w = frames[0].shape[:2]
+    print(f"\n📊 Detection cost per frame ({len(frames)} frames at {w}x{h})")
+    print(f"{'scale':>6} {'detect res':>11} {'cpu ms':>8} {'wall ms':>8} {'faces':>6}")
+    for r in results:
+        res = f"{int(w * r['scale'])}x{int(h * r['scale'])}"
+        print(f"{r['scale']:>6.2f} {res:>11} {r['cpu_ms']:>8.2f} {r['wall_ms']:>8.2f} {r['faces']:>6}")
+
+
+# ---------------------------------------------------------
+# VOICE: CAPTURE FORMAT
+# ---------------------------------------------------------
+
+def synth_audio(seconds, rate, dtype, seed=0):
+    """Background noise with a few loud bursts, in the capture sample type."""
+    rng = np.random.default_rng(seed)
+    audio = rng.normal(0, 0.01, int(seconds * rate))
+    for start in range(rate, len(audio) - rate, 10 * rate):
+        audio[start:start + rate // 2] += 0.3 * np.sin(np.arange(rate // 2) * 2 * np.pi * 220 / rate)
+    audio = np.clip(audio, -1, 1)
+    if np.dtype(dtype).kind == "i":
+        return (audio * np.iinfo(dtype).max).astype(dtype)
+    return audio.astype(dtype)
+
+
+def bench_audio_formats(seconds=60, formats=AUDIO_FORMATS, hop=None, window=None):
+    """Streams synthetic audio through the ring/sliding-RMS path at each
+    format, and writes a clip with each codec, to compare cost and size."""
+    import voice
+
+    hop = hop or voice.HOP_SECONDS
+    window = window or voice.WINDOW_SECONDS
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rate, dtype in formats:
+            audio = synth_audio(seconds, rate, dtype)
+            hop_samples = int(hop * rate)
+            window_hops = max(1, round(window / hop))
+            fmt = voice.AudioFormat(rate, dtype)
+            ring = voice.AudioRing(int(voice.RING_SECONDS / hop), hop_samples, fmt.dtype)
+            rms = voice.SlidingRMS(ring, window_hops, fmt.scale)
+
+            windows = 0
+            cpu0 = time.process_time()
+            for start in range(0, len(audio), hop_samples):
+                ring.write(audio[start:start + hop_samples])
+                windows += sum(1 for _ in rms.advance())
+            cpu = time.process_time() - cpu0
+
+            clip = audio[:int(4 * rate)]
+            sizes = {}
+            for codec in sorted(voice.CODECS):
+                fmt.codec = codec
+                path = os.path.join(tmp, f"clip_{rate}_{dtype}{voice.CODECS[codec]['ext']}")
+                fmt.write(path, clip)
+                sizes[codec] = os.path.getsize(path)
+
+            results.append({
+                "format": f"{rate / 1000:g}k {dtype}",
+                "bytes_per_s": rate * np.dtype(dtype).itemsize,
+                "ring_kb": ring.buf.nbytes / 1024,
+                "cpu_ms_per_s": cpu / seconds * 1000,
+                "windows": windows,
+                "clip_kb": {c: n / 1024 for c, n in sizes.items()},
+            })
+    return results
+
+
+def print_audio_table(results, seconds):
+    base = results[0]
+    codecs = sorted(results[0]["clip_kb"])
+    print(f"\n📊 Voice capture formats ({seconds}s of audio, 4s evidence clip)")
+    header = f"{'format':>14} {'KB/s in':>8} {'ring KB':>8} {'cpu ms/s':>9} {'windows':>8}"
+    header += "".join(f" {c + ' KB':>10}" for c in codecs)
+    print(header)
+    for r in results:
+        line = (f"{r['format']:>14} {r['bytes_per_s'] / 1024:>8.1f} {r['ring_kb']:>8.0f} "
+                f"{r['cpu_ms_per_s']:>9.3f} {r['windows']:>8}")
+        line += "".join(f" {r['clip_kb'][c]:>10.0f}" for c in codecs)
+        print(line)
+    last = results[-1]
+    print(f"\n{last['format']} vs {base['format']}: "
+          f"{base['bytes_per_s'] / last['bytes_per_s']:.1f}x less capture bandwidth, "
+          f"{base['cpu_ms_per_s'] / max(last['cpu_ms_per_s'], 1e-9):.1f}x less analysis CPU")
+
+
+# ---------------------------------------------------------
+# REPLAY: RECORDED SESSION THROUGH BOTH MONITORS
+# ---------------------------------------------------------
+
+def percentile_ms(latencies, q):
+    return float(np.percentile(latencies, q)) * 1000 if latencies else 0.0
+
+
+def replay_video(path, scale=face.DETECT_SCALE, mode="full"):
+    """Every frame of `path` through a headless FaceMonitor, back to back."""
+    source = VideoFileSource(path)
+    if not source.opened():
+        raise SystemExit(f"❌ Could not open video: {path}")
+    tracker = face.FaceTracker(params=face.scaled_params(scale)) if mode == "track" else None
+    writer = face.EvidenceWriter()
+    writer.start()
+    monitor = face.FaceMonitor(scale, tracker, writer, draw=False)
+
+    latencies = []
+    started = time.perf_counter()
+    while True:
+        ok, frame = source.read()
+        if not ok:
+            break
+        t0 = time.perf_counter()
+        monitor.process(frame, t0)
+        latencies.append(time.perf_counter() - t0)
+    monitor.close()
+    elapsed = time.perf_counter() - started
+    writer.close()
+    source.release()
+    return {"monitor": "face", "units": monitor.frames, "unit": "frames", "events": monitor.events,
+            "seconds": elapsed, "latencies": latencies}
+
+
+def replay_audio(path, vad=True):
+    """Every hop of `path` through a VoiceMonitor, calibrated on the first
+    4 seconds like the live monitor."""
+    import voice
+
+    source = AudioFileSource(path, voice.AudioFormat())
+    threshold = voice.calibrate_background(source, 4) * 1.5
+    monitor = voice.VoiceMonitor(threshold, source.fmt, vad=vad)
+
+    latencies = []
+    started = time.perf_counter()
+    for block in source.blocks(monitor.hop_samples):
+        t0 = time.perf_counter()
+        monitor.feed(block)
+        monitor.process()
+        latencies.append(time.perf_counter() - t0)
+    monitor.close()
+    elapsed = time.perf_counter() - started
+    source.close()
+    return {"monitor": "voice", "units": monitor.windows, "unit": "windows", "events": monitor.events,
+            "seconds": elapsed, "latencies": latencies}
+
+
+def replay_session(video=None, audio=None, scale=face.DETECT_SCALE, mode="full", vad=True):
+    """Runs both monitors concurrently (as in a live session) with evidence
+    and alert logs redirected to a temporary directory."""
+    import voice
+
+    jobs = []
+    if video:
+        jobs.append(lambda: replay_video(video, scale, mode))
+    if audio:
+        jobs.append(lambda: replay_audio(audio, vad))
+
+    results = []
+    errors = []
+
+    def run(job):
+        try:
+            results.append(job())
+        except BaseException as e:
+            errors.append(e)
+
+    saved = face.capture_dir, face.alerts_file, voice.capture_dir
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as quiet:
+        face.capture_dir = tmp
+        face.alerts_file = os.path.join(tmp, "alerts.log")
+        voice.capture_dir = tmp
+        try:
+            with contextlib.redirect_stdout(quiet):
+                threads = [threading.Thread(target=run, args=(job,)) for job in jobs]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+        finally:
+            face.capture_dir, face.alerts_file, voice.capture_dir = saved
+
+    if errors:
+        raise errors[0]
+    return sorted(results, key=lambda r: r["monitor"])
+
+
+def print_replay_table(results):
+    print("\n📊 Recorded session replay (as fast as possible)")
+    print(f"{'monitor':>8} {'processed':>14} {'per sec':>9} {'events':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        processed = f"{r['units']} {r['unit']}"
+        print(f"{r['monitor']:>8} {processed:>14} {r['units'] / max(r['seconds'], 1e-9):>9.1f} "
+              f"{r['events']:>7} {percentile_ms(r['latencies'], 50):>8.2f} "
+              f"{percentile_ms(r['latencies'], 99):>8.2f}")
+    print("(voice latency is per hop block fed: ring write + every window it completes)")
+
+
+# ---------------------------------------------------------
+# INCIDENT CHECK: TRACK MODE RAISES THE SAME INCIDENTS AS FULL MODE
+# ---------------------------------------------------------
+
+class BlobCascade:
+    """Stands in for the Haar cascade: every white rectangle is a face.
+    Works on the full frame and on ROI crops alike."""
+
+    def detectMultiScale(self, gray, **params):
+        _, mask = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return [cv2.boundingRect(c) for c in contours]
+
+
+def synth_faces(script, size=(480, 640)):
+    """Frames with one white 80x80 "face" per entry of `script` (faces per frame)."""
+    spots = [(100, 200), (400, 200), (250, 60)]
+    for count in script:
+        frame = np.zeros((*size, 3), np.uint8)
+        for (x, y) in spots[:count]:
+            cv2.rectangle(frame, (x, y), (x + 80, y + 80), (255, 255, 255), -1)
+        yield frame
+
+
+def count_incidents(script, mode):
+    """{incident type: incidents started} for `script` through a headless FaceMonitor."""
+    started = {}
+
+    class Bus:
+        def publish(self, source, kind, payload=None):
+            if kind == "incident":
+                started[payload["type"]] = started.get(payload["type"], 0) + 1
+
+    tracker = face.FaceTracker() if mode == "track" else None
+    monitor = face.FaceMonitor(tracker=tracker, draw=False, bus=Bus())
+    now = time.perf_counter()
+    for frame in synth_faces(script):
+        monitor.process(frame, now)
+    monitor.close()
+    return started
+
+
+def check_incidents():
+    """A second person for 30 frames must open one multiface incident in
+    both detection modes. Returns True when it does."""
+    script = [1] * 10 + [2] * 30 + [1] * 20
+    saved = face.face_cascade, face.capture_dir, face.alerts_file
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as quiet:
+        face.face_cascade = BlobCascade()
+        face.capture_dir = tmp
+        face.alerts_file = os.path.join(tmp, "alerts.log")
+        try:
+            with contextlib.redirect_stdout(quiet):
+                results = {mode: count_incidents(script, mode) for mode in ("full", "track")}
+        finally:
+            face.face_cascade, face.capture_dir, face.alerts_file = saved
+
+    ok = True
+    for mode, started in results.items():
+        multiface = started.get("multiface", 0)
+        ok = ok and multiface == 1
+        print(f"{'✅' if multiface == 1 else '❌'} {mode:>5}: {multiface} multiface incident(s), all: {started}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monitoring benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    scale = sub.add_parser("face-scale", help="face detection cost per frame at each scale factor")
+    scale.add_argument("--video", help="video file to read frames from (default: camera 0)")
+    scale.add_argument("--image", help="single image repeated as every frame")
+    scale.add_argument("--frames", type=int, default=100)
+    scale.add_argument("--scales", type=float, nargs="+", default=DEFAULT_SCALES)
+
+    audio = sub.add_parser("audio-format", help="voice monitor cost and clip size per capture format")
+    audio.add_argument("--seconds", type=int, default=60)
+
+    replay = sub.add_parser("replay", help="recorded session through the face and voice monitors")
+    replay.add_argument("--video", help="recorded camera session")
+    replay.add_argument("--audio", help="recorded microphone session (WAV/FLAC)")
+    replay.add_argument("--scale", type=float, default=face.DETECT_SCALE)
+    replay.add_argument("--mode", choices=["full", "track"], default="full")
+    replay.add_argument("--no-vad", dest="vad", action="store_false")
+
+    sub.add_parser("incident-check", help="track mode must raise the same incidents as full mode")
+
+    args = parser.parse_args(argv)
+
+    if args.bench == "face-scale":
+        frames = grab_frames(args.video, args.image, args.frames)
+        print_scale_table(bench_scales(frames, args.scales), frames)
+    elif args.bench == "audio-format":
+        print_audio_table(bench_audio_formats(args.seconds), args.seconds)
+    elif args.bench == "replay":
+        if not (args.video or args.audio):
+            parser.error("replay needs --video and/or --audio")
+        print_replay_table(replay_session(args.video, args.audio, args.scale, args.mode, args.vad))
+    elif args.bench == "incident-check":
+        if not check_incidents():
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,39 @@
 import cv2
 import numpy as np
-import os 
-import time 
+import os
+import time
 from collections import deque
 import signal
 import sys
-import json
+import argparse
+import queue
+import threading
 
+from suspicion import SuspicionCounter, SuspicionClient, parse_address, DEFAULT_SESSION
+from sources import open_frame_source
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-suspect_file = os.path.abspath(os.path.join(BASE_DIR, "..", "suspect_count.json"))
-
-if not os.path.exists(suspect_file):
-    with open(suspect_file, "w") as f:
-        json.dump({"current": 0}, f)
 
-def add_suspect():
-    data = json.load(open(suspect_file))
-    data["current"] += 1
-    json.dump(data, open(suspect_file, "w"))
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+alerts_file = os.path.abspath(os.path.join(BASE_DIR, "..", "alerts.log"))
+capture_dir = 'captures'
 
 # ✅ Save suspicious event photo (no CSV)
-def capture_suspicious_event(event_type, frame):
+# (with `message`, the saved photo is annotated; the live frame is not drawn on)
+def capture_suspicious_event(event_type, frame, writer=None, box=None, message=None):
     timestamp = time.strftime('%Y%m%d_%H%M%S')
-    filename = f'captures/{event_type}_{timestamp}.jpg'
-    cv2.imwrite(filename, frame)
+    filename = os.path.join(capture_dir, f'{event_type}_{timestamp}.jpg')
+    if writer is not None or message is not None:
+        # the one copy: the detection worker keeps using (and drawing on) the live
+        # frame; this one belongs to the writer thread from here on
+        frame = frame.copy()
+    if message is not None:
+        annotate_evidence(frame, box, message)
+    if writer is not None:
+        if not writer.submit(filename, frame):
+            print(f"⚠️ Evidence queue full, dropped: {filename}")
+            return
+    else:
+        cv2.imwrite(filename, frame)
     print(f"📸 Suspicious event captured: {event_type} -> {filename}")
 
 
@@ -34,83 +43,566 @@ def handle_exit(signum, frame):
     global stop_signal
     stop_signal = True
 
-signal.signal(signal.SIGTERM, handle_exit)
-signal.signal(signal.SIGINT, handle_exit)
-
-os.makedirs('captures', exist_ok=True)
 
 face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
 
-prev_face_position = None
-movement_threshold = 10
-movement_history = deque(maxlen=3)
+DETECT_PARAMS = dict(
+    scaleFactor=1.1,
+    minNeighbors=6,
+    minSize=(60, 60),
+    maxSize=(400, 400)
+)
+
+# ✅ Tracking mode settings
+FULL_SCAN_EVERY = 5      # full-frame cascade every N frames
+ROI_PADDING = 0.5        # search area around last face (fraction of its size)
+STATS_INTERVAL = 10      # seconds between detection-rate reports
+
+# ✅ Incident rules: consecutive frames to open / quiet frames to close an
+# incident, and whether its start is saved as evidence + counted as suspicion.
+# A closed incident cannot reopen for CAPTURE_INTERVAL seconds.
+CAPTURE_INTERVAL = 5
+INCIDENT_RULES = {
+    "multiface": {"on": 2, "off": 5, "evidence": True},
+    "movement": {"on": 1, "off": 5, "evidence": True},
+    "no_face": {"on": 10, "off": 3, "evidence": False},
+}
 
-cap = cv2.VideoCapture(0)
-cap.set(3, 1280)
-cap.set(4, 720)
-cap.set(cv2.CAP_PROP_AUTOFOCUS, 1)
+# ✅ Pipeline settings
+EVIDENCE_QUEUE_SIZE = 32 # pending evidence JPEGs before new ones are dropped
 
-capture_interval = 5
-last_capture_time = time.time()
+# ✅ Detection resolution (1.0 = full capture size)
+DETECT_SCALE = 1.0
 
-# ✅ Exit loop when SIGTERM is received
-while not stop_signal:
-    ret, frame = cap.read()
-    if not ret:
-        print("⚠️ ALERT: Failed to grab frame!")
-        break
 
+def scaled_params(scale):
+    if scale == 1.0:
+        return DETECT_PARAMS
+    params = dict(DETECT_PARAMS)
+    params["minSize"] = tuple(max(1, int(v * scale)) for v in DETECT_PARAMS["minSize"])
+    params["maxSize"] = tuple(max(1, int(v * scale)) for v in DETECT_PARAMS["maxSize"])
+    return params
+
+
+def prepare_gray(frame, scale=DETECT_SCALE):
+    if scale != 1.0:
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    gray = cv2.equalizeHist(gray)
-
-    faces = face_cascade.detectMultiScale(
-        gray,
-        scaleFactor=1.1,
-        minNeighbors=6,
-        minSize=(60, 60),
-        maxSize=(400, 400)
-    )
-
-    if len(faces) > 0:
-
-        # ✅ MULTIPLE FACES FOUND
-        if len(faces) > 1:
-            cv2.putText(frame, "⚠ MULTIPLE FACES DETECTED!", (50, 100),cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 3)
-            print("⚠ MULTIPLE FACES DETECTED!")
-            
-            capture_suspicious_event("multiface", frame)
-            add_suspect()
-            
-        # ✅ Select largest face for tracking
-        largest_face = max(faces, key=lambda rect: rect[2] * rect[3])
-        (x, y, w, h) = largest_face
-        center_current = (x + w//2, y + h//2)
+    return cv2.equalizeHist(gray)
+
+
+def to_full_res(faces, scale):
+    if scale == 1.0 or len(faces) == 0:
+        return faces
+    return [tuple(int(round(v / scale)) for v in rect) for rect in faces]
+
+
+def detect_full(gray, params=DETECT_PARAMS):
+    return face_cascade.detectMultiScale(gray, **params)
+
+
+def detect_in_roi(gray, box, padding=ROI_PADDING, params=DETECT_PARAMS):
+    (x, y, w, h) = box
+    pad_w, pad_h = int(w * padding), int(h * padding)
+
+    x0, y0 = max(x - pad_w, 0), max(y - pad_h, 0)
+    x1 = min(x + w + pad_w, gray.shape[1])
+    y1 = min(y + h + pad_h, gray.shape[0])
+
+    faces = face_cascade.detectMultiScale(gray[y0:y1, x0:x1], **params)
+    return [(fx + x0, fy + y0, fw, fh) for (fx, fy, fw, fh) in faces]
+
+
+class FaceTracker:
+    """Full-frame cascade every `every` frames (or after a tracking miss),
+    cascade on a padded ROI around the last largest face in between.
+
+    An ROI pass only looks around one face, so it cannot tell how many
+    people are in the frame: `last_full` says whether the last detect()
+    saw the whole frame, and a full scan that finds several faces is
+    followed by another full scan (to confirm them without waiting
+    `every` frames)."""
+
+    def __init__(self, every=FULL_SCAN_EVERY, padding=ROI_PADDING, params=DETECT_PARAMS):
+        self.every = max(1, every)
+        self.padding = padding
+        self.params = params
+        self.last_box = None
+        self.since_full = 0
+        self.full_scans = 0
+        self.last_full = False
+        self.rescan = False
+
+    def _full(self, gray):
+        self.since_full = 0
+        self.full_scans += 1
+        self.last_full = True
+        faces = detect_full(gray, self.params)
+        self.rescan = len(faces) > 1
+        return faces
+
+    def detect(self, gray):
+        self.last_full = False
+        if self.last_box is None or self.rescan or self.since_full + 1 >= self.every:
+            faces = self._full(gray)
+        else:
+            self.since_full += 1
+            faces = detect_in_roi(gray, self.last_box, self.padding, self.params)
+            if len(faces) == 0:
+                # tracking miss -> confirm with a full-frame pass
+                faces = self._full(gray)
+
+        if len(faces) > 0:
+            self.last_box = tuple(max(faces, key=lambda rect: rect[2] * rect[3]))
+        else:
+            self.last_box = None
+        return faces
+
+
+def detect_faces(frame, scale=DETECT_SCALE, tracker=None):
+    """Runs detection at `scale` and returns boxes in full-resolution pixels."""
+    gray = prepare_gray(frame, scale)
+    if tracker is not None:
+        faces = tracker.detect(gray)
+    else:
+        faces = detect_full(gray, scaled_params(scale))
+    return to_full_res(faces, scale)
+
+
+class LatestFrame:
+    """Single-slot handoff between threads: put() replaces any frame the
+    reader has not taken yet, so the reader always gets the newest one.
+    With drop=False put() waits instead (offline files: every frame counts)."""
+
+    def __init__(self, drop=True):
+        self.cond = threading.Condition()
+        self.drop = drop
+        self.item = None
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self.cond:
+            if not self.drop:
+                self.cond.wait_for(lambda: self.item is None or self.closed)
+            if self.item is not None:
+                self.dropped += 1
+            self.item = item
+            self.cond.notify_all()
+
+    def get(self, timeout=None):
+        with self.cond:
+            self.cond.wait_for(lambda: self.item is not None or self.closed, timeout)
+            item, self.item = self.item, None
+            self.cond.notify_all()
+            return item
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def depth(self):
+        return 0 if self.item is None else 1
+
+
+class EvidenceWriter(threading.Thread):
+    """Writes evidence JPEGs off the capture/detection path."""
+
+    def __init__(self, maxsize=EVIDENCE_QUEUE_SIZE):
+        super().__init__(name="evidence-writer", daemon=True)
+        self.queue = queue.Queue(maxsize)
+        self.written = 0
+        self.dropped = 0
+
+    def submit(self, filename, frame):
+        try:
+            self.queue.put_nowait((filename, frame))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            filename, frame = item
+            cv2.imwrite(filename, frame)
+            self.written += 1
+
+    def close(self):
+        self.queue.put(None)
+        self.join()
+
+
+class DetectionStats:
+    """Prints the detections per second the loop sustains, alert latency
+    (frame captured -> alert raised) and pipeline queue depths."""
+
+    def __init__(self, mode, interval=STATS_INTERVAL, metrics=None):
+        self.mode = mode
+        self.interval = interval
+        self.metrics = metrics
+        self.frames = 0
+        self.busy = 0.0
+        self.latencies = []
+        self.started = time.perf_counter()
+
+    def alert(self, latency):
+        self.latencies.append(latency)
+
+    def add(self, seconds, tracker=None):
+        self.frames += 1
+        self.busy += seconds
+        elapsed = time.perf_counter() - self.started
+        if elapsed < self.interval:
+            return
+
+        extra = ""
+        if tracker is not None:
+            extra = f", full scans {tracker.full_scans}/{self.frames}"
+            tracker.full_scans = 0
+        if self.latencies:
+            extra += (f", alert latency avg {np.mean(self.latencies) * 1000:.0f} ms"
+                      f" / max {max(self.latencies) * 1000:.0f} ms")
+        if self.metrics is not None:
+            extra += ", " + " ".join(f"{k}={v}" for k, v in self.metrics().items())
+        print(f"📊 [{self.mode}] {self.frames / elapsed:.1f} loop fps, "
+              f"{self.frames / max(self.busy, 1e-9):.1f} detections/s{extra}")
+
+        self.frames = 0
+        self.busy = 0.0
+        self.latencies = []
+        self.started = time.perf_counter()
+
+
+def log_incident(incident):
+    start = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(incident["start"]))
+    end = time.strftime('%H:%M:%S', time.localtime(incident["end"]))
+    duration = incident["end"] - incident["start"]
+    with open(alerts_file, "a") as f:
+        f.write(f"[{start}] {incident['type']} until {end} ({duration:.1f}s, "
+                f"{incident['frames']} frames, peak {incident['peak']:g})\n")
 
+
+class IncidentTracker:
+    """Turns per-frame detections of one event type into incidents.
+
+    Opens after `on` consecutive active frames, closes after `off` quiet
+    frames, then stays shut for `cooldown` seconds. update() returns
+    ("start" | "end" | None, incident)."""
+
+    def __init__(self, event_type, on=1, off=5, cooldown=CAPTURE_INTERVAL):
+        self.event_type = event_type
+        self.on = max(1, on)
+        self.off = max(1, off)
+        self.cooldown = cooldown
+        self.active_run = 0
+        self.quiet_run = 0
+        self.cooldown_until = 0.0
+        self.incident = None
+
+    def update(self, active, severity=0.0, now=None):
+        now = time.time() if now is None else now
+
+        if self.incident is None:
+            if not active or now < self.cooldown_until:
+                self.active_run = 0
+                return None, None
+            self.active_run += 1
+            if self.active_run < self.on:
+                return None, None
+            self.active_run = 0
+            self.quiet_run = 0
+            self.incident = {"type": self.event_type, "start": now, "end": None,
+                             "frames": self.on, "peak": severity}
+            return "start", self.incident
+
+        if active:
+            self.quiet_run = 0
+            self.incident["frames"] += 1
+            self.incident["peak"] = max(self.incident["peak"], severity)
+            return None, self.incident
+
+        self.quiet_run += 1
+        if self.quiet_run < self.off:
+            return None, self.incident
+        return "end", self.close(now)
+
+    def close(self, now=None):
+        incident, self.incident = self.incident, None
+        if incident is not None:
+            incident["end"] = time.time() if now is None else now
+            self.cooldown_until = incident["end"] + self.cooldown
+        return incident
+
+
+def annotate_evidence(frame, box, message):
+    cv2.putText(frame, message, (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 3)
+    if box is not None:
+        (x, y, w, h) = box
         cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
 
-        # ✅ Detect face movement
-        if prev_face_position is not None:
-            dx = abs(center_current[0] - prev_face_position[0])
-            dy = abs(center_current[1] - prev_face_position[1])
-            distance = np.sqrt(dx**2 + dy**2)
 
-            if distance > movement_threshold:
-                cv2.putText(frame, "⚠ FACE MOVEMENT!", (50, 50),cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 3)
-                print("⚠ FACE MOVEMENT DETECTED!")
+class FaceMonitor:
+    """Per-frame detection and the movement / multi-face event rules.
+    With draw=False nothing is drawn on live frames; only the copies saved
+    as evidence get annotated."""
+
+    def __init__(self, scale=DETECT_SCALE, tracker=None, writer=None, stats=None, draw=True,
+                 suspects=None, session=DEFAULT_SESSION, candidate="", bus=None):
+        self.scale = scale
+        self.bus = bus
+        self.tracker = tracker
+        self.writer = writer
+        self.stats = stats
+        self.draw = draw
+        self.suspects = suspects
+        self.session = session
+        self.candidate = candidate
+        self.frames = 0
+        self.events = 0
+        self.prev_face_position = None
+        self.movement_threshold = 10
+        self.movement_history = deque(maxlen=3)
+
+        self.capture_interval = CAPTURE_INTERVAL
+        self.incidents = {
+            event_type: IncidentTracker(event_type, rule["on"], rule["off"], self.capture_interval)
+            for event_type, rule in INCIDENT_RULES.items()
+        }
+
+    def _event(self, event_type, frame, captured_at, box=None, message=""):
+        if self.stats is not None:
+            self.stats.alert(time.perf_counter() - captured_at)
+        if self.draw:
+            # already annotated on the live frame
+            capture_suspicious_event(event_type, frame, self.writer)
+        else:
+            capture_suspicious_event(event_type, frame, self.writer, box, message)
+        if self.suspects is not None:
+            self.suspects.add(self.session, self.candidate, event_type)
+
+    def _update(self, event_type, active, severity, frame, captured_at, box=None, message=""):
+        transition, incident = self.incidents[event_type].update(active, severity)
+        if transition == "start":
+            self.events += 1
+            if self.bus is not None:
+                self.bus.publish("face", "incident", dict(incident))
+            print(f"⚠ {message}")
+            if INCIDENT_RULES[event_type]["evidence"]:
+                self._event(event_type, frame, captured_at, box, message)
+        elif transition == "end":
+            self._closed(incident)
+
+    def _closed(self, incident):
+        print(f"✅ {incident['type']} incident over after {incident['end'] - incident['start']:.1f}s "
+              f"(peak {incident['peak']:g})")
+        log_incident(incident)
+
+    def close(self):
+        for tracker in self.incidents.values():
+            incident = tracker.close()
+            if incident is not None:
+                self._closed(incident)
+
+    def process(self, frame, captured_at):
+        self.frames += 1
+        t0 = time.perf_counter()
+        faces = detect_faces(frame, self.scale, self.tracker)
+        if self.stats is not None:
+            self.stats.add(time.perf_counter() - t0, self.tracker)
+        if self.frames == 1 and self.bus is not None:
+            self.bus.publish("face", "ready")
+
+        largest_face = None
+        distance = 0.0
+
+        if len(faces) > 0:
+
+            # ✅ Select largest face for tracking
+            largest_face = max(faces, key=lambda rect: rect[2] * rect[3])
+            (x, y, w, h) = largest_face
+            center_current = (x + w//2, y + h//2)
+
+            # ✅ MULTIPLE FACES FOUND
+            if len(faces) > 1 and self.draw:
+                cv2.putText(frame, "⚠ MULTIPLE FACES DETECTED!", (50, 100),cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 3)
+
+            if self.draw:
+                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+
+            # ✅ Detect face movement
+            if self.prev_face_position is not None:
+                dx = abs(center_current[0] - self.prev_face_position[0])
+                dy = abs(center_current[1] - self.prev_face_position[1])
+                distance = np.sqrt(dx**2 + dy**2)
+
+                if distance > self.movement_threshold and self.draw:
+                    cv2.putText(frame, "⚠ FACE MOVEMENT!", (50, 50),cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 3)
+
+            self.prev_face_position = center_current
 
-                capture_suspicious_event("movement", frame)
-                add_suspect()
-                
-        prev_face_position = center_current
+        else:
+            self.prev_face_position = None
+            if self.draw:
+                cv2.putText(frame, "No face detected!", (50, 50),cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 255), 2)
 
+        # ✅ One event per incident, not per frame. Face counts only come from
+        # full-frame scans: a tracking (ROI) frame neither opens nor closes multiface
+        if self.tracker is None or self.tracker.last_full:
+            self._update("multiface", len(faces) > 1, len(faces), frame, captured_at,
+                         largest_face, "MULTIPLE FACES DETECTED!")
+        self._update("movement", distance > self.movement_threshold, round(float(distance), 1),
+                     frame, captured_at, largest_face, "FACE MOVEMENT DETECTED!")
+        self._update("no_face", len(faces) == 0, 1, frame, captured_at,
+                     None, "No face detected!")
+
+
+# ✅ Pipeline threads
+def capture_loop(cap, frames, stop_event):
+    while not stop_event.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            if cap.live:
+                print("⚠️ ALERT: Failed to grab frame!")
+            break
+        frames.put((frame, time.perf_counter()))
+    frames.close()
+
+
+def detect_loop(monitor, frames, display, stop_event):
+    while not stop_event.is_set():
+        item = frames.get(timeout=0.5)
+        if item is None:
+            if frames.closed:
+                break
+            continue
+        frame, captured_at = item
+        monitor.process(frame, captured_at)
+        if display is not None:
+            display.put(frame)
+    if display is not None:
+        display.close()
+
+
+def open_suspects(address=None):
+    """Local suspicion counter, or a client of the service at `address`
+    that falls back to the local counter."""
+    # prune=False: the files belong to the quiz server's counter (it deletes them)
+    suspects = SuspicionCounter(prune=False)
+    suspects.start()
+    if address:
+        suspects = SuspicionClient(parse_address(address), fallback=suspects)
+    return suspects
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Face monitoring")
+    parser.add_argument("--mode", choices=["full", "track"], default="full",
+                        help="full: cascade on every frame, track: ROI tracking between full scans")
+    parser.add_argument("--every", type=int, default=FULL_SCAN_EVERY,
+                        help="frames between full-frame scans in track mode")
+    parser.add_argument("--scale", type=float, default=DETECT_SCALE,
+                        help="detection resolution relative to the capture (e.g. 0.5)")
+    parser.add_argument("--headless", action="store_true",
+                        help="no window and no drawing; only evidence frames are annotated")
+    parser.add_argument("--source",
+                        help="video file to read instead of the camera (every frame is processed)")
+    parser.add_argument("--session", default=DEFAULT_SESSION, help="suspicion counter session")
+    parser.add_argument("--candidate", default="", help="candidate the suspicion counts belong to")
+    parser.add_argument("--suspicion-addr",
+                        help="host:port of the suspicion service (default: count locally)")
+    args = parser.parse_args(argv)
+    if not 0 < args.scale <= 1:
+        parser.error(f"--scale must be in (0, 1], got {args.scale}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    signal.signal(signal.SIGTERM, handle_exit)
+    signal.signal(signal.SIGINT, handle_exit)
+
+    os.makedirs(capture_dir, exist_ok=True)
+
+    cap = open_frame_source(args.source)
+    if not cap.opened():
+        print(f"❌ Could not open video source: {cap.name}")
+        return
+
+    # a file is read faster than it is analysed: wait instead of dropping
+    frames = LatestFrame(drop=cap.live)
+    display = None if args.headless else LatestFrame()
+    writer = EvidenceWriter()
+    stop_event = threading.Event()
+
+    def metrics():
+        return {
+            "capture_q": frames.depth(),
+            "display_q": display.depth() if display is not None else 0,
+            "evidence_q": writer.queue.qsize(),
+            "stale_dropped": frames.dropped,
+            "evidence_dropped": writer.dropped,
+        }
+
+    params = scaled_params(args.scale)
+    tracker = FaceTracker(args.every, params=params) if args.mode == "track" else None
+    stats = DetectionStats(args.mode, metrics=metrics)
+    # ✅ Suspicion counts stay in memory; the service (or local counter) flushes them
+    suspects = open_suspects(args.suspicion_addr)
+
+    monitor = FaceMonitor(args.scale, tracker, writer, stats, draw=not args.headless,
+                          suspects=suspects, session=args.session, candidate=args.candidate)
+
+    capture_thread = threading.Thread(target=capture_loop, args=(cap, frames, stop_event), name="capture", daemon=True)
+    detect_thread = threading.Thread(target=detect_loop, args=(monitor, frames, display, stop_event), name="detect", daemon=True)
+    started = time.perf_counter()
+    writer.start()
+    capture_thread.start()
+    detect_thread.start()
+
+    if args.headless:
+        # ✅ Nothing to render: just wait for SIGTERM or the end of the source
+        while not stop_signal and detect_thread.is_alive():
+            detect_thread.join(0.2)
     else:
-        prev_face_position = None
-        cv2.putText(frame, "No face detected!", (50, 50),cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 255), 2)
-        
-    cv2.imshow("Face Monitoring", frame)
-    key = cv2.waitKey(1)
-    if key == ord('q') or key == ord('Q'):
-        print("👋 Face monitoring stopped manually (Q pressed).")
-        break
-cap.release()
-cv2.destroyAllWindows()
+        # ✅ Exit loop when SIGTERM is received (GUI stays on the main thread)
+        while not stop_signal:
+            frame = display.get(timeout=0.1)
+            if frame is None:
+                if display.closed:
+                    break
+                continue
+
+            cv2.imshow("Face Monitoring", frame)
+            key = cv2.waitKey(1)
+            if key == ord('q') or key == ord('Q'):
+                print("👋 Face monitoring stopped manually (Q pressed).")
+                break
+
+    # capture ended on its own: the camera stopped delivering frames
+    camera_failed = cap.live and frames.closed and not stop_event.is_set()
+    stop_event.set()
+    frames.close()
+    capture_thread.join()
+    detect_thread.join()
+    monitor.close()
+    writer.close()
+    suspects.close()
+    cap.release()
+    if not args.headless:
+        cv2.destroyAllWindows()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Face monitor processed {monitor.frames} frames in {elapsed:.1f}s "
+          f"({monitor.frames / max(elapsed, 1e-9):.1f} fps)")
+    if camera_failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import os
+import threading
+
+from supervisor import ManagedProcess, call
+
+
+# Lightweight handle on the monitor supervisor process: no cv2/numpy
+# import here, so the quiz front ends stay fast to start.
+
+MONITOR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "monitor.py")
+
+READY_TIMEOUT = 15       # seconds to wait for every monitor to report ready
+STOP_TIMEOUT = 5         # seconds to wait for a clean shutdown before killing
+WARM_TIMEOUT = 30        # seconds for a standby worker to open devices + calibrate
+LEASE_TIMEOUT = 2        # seconds a quiz start waits for a warm worker before retrying later
+POOL_SIZE = 1            # warm standby workers (one per camera/microphone on the machine)
+
+
+class MonitorProcess:
+    """`python monitor.py ...` as one child process (face + voice threads),
+    supervised on the background asyncio loop (see supervisor.py): the
+    child's READY/FAILED/WARM lines wake the waits below, heartbeats are
+    watched, and a crashed child is restarted with backoff.
+
+    With standby=True the child only warms up (camera open, microphone
+    calibrated) and waits: lease() starts a session in it, release() ends
+    the session and leaves it warm for the next one."""
+
+    def __init__(self, args=(), cwd=None, standby=False):
+        argv = [MONITOR_PATH, *args, *(["--standby", "--headless"] if standby else [])]
+        self.child = call(self._start(argv, cwd, standby))
+
+    @staticmethod
+    async def _start(argv, cwd, standby):
+        return await ManagedProcess("monitor", argv, standby=standby, cwd=cwd).start()
+
+    @property
+    def warm_in(self):
+        return self.child.warm_in
+
+    @property
+    def ready_in(self):
+        return self.child.ready_in
+
+    @property
+    def failure(self):
+        return self.child.failure
+
+    def running(self):
+        # a child being restarted still counts: it is coming back on its own
+        return not self.child.exited.is_set()
+
+    def wait_warm(self, timeout=WARM_TIMEOUT):
+        return call(self.child.wait_warm(timeout))
+
+    def wait_ready(self, timeout=READY_TIMEOUT):
+        return call(self.child.wait_ready(timeout))
+
+    def lease(self, session, candidate="", suspicion_addr=None):
+        """Starts monitoring a session in a warm standby worker."""
+        return call(self.child.lease(session, candidate, suspicion_addr))
+
+    def release(self, timeout=STOP_TIMEOUT):
+        """Ends the session; True when the worker is warm again."""
+        return call(self.child.release(timeout))
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """SIGTERM, then wait for the supervisor to shut the monitors down."""
+        return call(self.child.stop(timeout))
+
+
+class MonitorPool:
+    """Standby MonitorProcess workers that have already imported cv2/numpy,
+    loaded the cascade, opened the camera and calibrated the microphone.
+
+    lease() hands a warm worker to a quiz session; release() ends the
+    session and puts the worker back for the next candidate, so a quiz
+    start is one stdin line away. When no worker is warm (all leased, or
+    still calibrating) lease() gives up after LEASE_TIMEOUT instead of
+    holding the caller for a whole warm-up: a cold worker is started in
+    the background and the caller retries.
+
+    The pool is POOL_SIZE workers because a worker holds the machine's
+    camera and microphone: one monitored candidate per machine."""
+
+    def __init__(self, size=POOL_SIZE, args=(), cwd=None):
+        self.size = size
+        self.args = list(args)
+        self.cwd = cwd
+        self.lock = threading.Lock()
+        self.idle = []
+
+    def _spawn(self):
+        return MonitorProcess(self.args, self.cwd, standby=True)
+
+    def prewarm(self):
+        """Tops the pool up to `size` idle workers (they warm up in the background)."""
+        with self.lock:
+            self.idle = [w for w in self.idle if w.running()]
+            while len(self.idle) < self.size:
+                self.idle.append(self._spawn())
+        return self
+
+    def lease(self, session, candidate="", suspicion_addr=None, timeout=LEASE_TIMEOUT):
+        """The worker now monitoring `session`, or None when no worker got
+        warm within `timeout` seconds (try again shortly)."""
+        with self.lock:
+            self.idle = [w for w in self.idle if w.running()]
+            if not self.idle:
+                self.idle.append(self._spawn())   # cold: warms up while the caller retries
+            # warm ones first: a worker still warming up beats a brand-new one
+            self.idle.sort(key=lambda w: w.warm_in is None)
+            worker = self.idle.pop(0)
+        if not worker.wait_warm(timeout):
+            with self.lock:
+                self.idle.append(worker)
+            return None
+        worker.lease(session, candidate, suspicion_addr)
+        return worker
+
+    def release(self, worker):
+        """Ends the worker's session and recycles it (or stops it when the
+        worker is unhealthy). If the pool is then over `size`, the workers
+        furthest from warm are stopped."""
+        recycled = worker.running() and worker.release()
+        with self.lock:
+            if recycled:
+                self.idle.append(worker)
+                self.idle.sort(key=lambda w: w.warm_in is None)
+                self.idle, extra = self.idle[:self.size], self.idle[self.size:]
+            else:
+                extra = [worker]
+        for w in extra:
+            w.stop()
+
+    def close(self):
+        with self.lock:
+            workers, self.idle = self.idle, []
+        for worker in workers:
+            worker.stop()
+
+
+# ---------------------------------------------------------
+# PROCESS-WIDE POOL
+# ---------------------------------------------------------
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def shared_pool(size=POOL_SIZE):
+    """The server's MonitorPool, created and pre-warmed once per process."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MonitorPool(size).prewarm()
+        return _pool
@@ -0,0 +1,440 @@
+import argparse
+import json
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+
+import cv2
+
+import face
+import voice
+from sources import open_frame_source, open_audio_source
+from suspicion import DEFAULT_SESSION
+from launcher import READY_TIMEOUT, STOP_TIMEOUT
+
+
+BUS_QUEUE_SIZE = 256     # undelivered events per subscriber before dropping
+HEARTBEAT_INTERVAL = 1.0 # seconds between HEARTBEAT lines to the parent
+
+
+# ---------------------------------------------------------
+# EVENT BUS
+# ---------------------------------------------------------
+# Every event is {"source": "face"|"voice"|"supervisor", "kind": ..., "time": ..., "data": ...}
+#   ready     monitor is analysing (camera frame processed / calibrated + stream open)
+#   incident  face incident started (data: the incident)
+#   alert     loud speech window (data: {"volume": v})
+#   error     monitor failed (data: {"error": message})
+#   stopped   monitor thread finished
+
+class EventBus:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = []
+        self.dropped = 0
+
+    def subscribe(self, maxsize=BUS_QUEUE_SIZE):
+        q = queue.Queue(maxsize)
+        with self.lock:
+            self.subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            if q in self.subscribers:
+                self.subscribers.remove(q)
+
+    def publish(self, source, kind, data=None):
+        event = {"source": source, "kind": kind, "time": time.time(), "data": data}
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                self.dropped += 1
+
+
+# ---------------------------------------------------------
+# WORKERS
+# ---------------------------------------------------------
+# warm() does the slow part once (camera open + first frame, microphone
+# calibration); run() monitors one session until `stop` is set and can be
+# called again for the next one; close() releases the device.
+
+class FaceWorker:
+    name = "face"
+
+    def __init__(self, video=None, scale=face.DETECT_SCALE, mode="full"):
+        self.video = video
+        self.scale = scale
+        self.mode = mode
+        self.cap = None
+        self.frames = None
+        self.capture = None
+        self.monitor = None
+        self.closing = threading.Event()
+
+    def warm(self):
+        self.cap = open_frame_source(self.video)
+        if not self.cap.opened():
+            raise RuntimeError(f"could not open video source: {self.cap.name}")
+        # live cameras keep streaming between sessions, only the newest frame is kept
+        self.frames = face.LatestFrame(drop=self.cap.live)
+        self.capture = threading.Thread(target=face.capture_loop, args=(self.cap, self.frames, self.closing),
+                                        name="capture", daemon=True)
+        self.capture.start()
+
+    def run(self, stop, bus, display=None, session=DEFAULT_SESSION, candidate="", suspicion_addr=None):
+        if self.frames.closed:
+            raise RuntimeError(f"video source ended: {self.cap.name}")
+        writer = face.EvidenceWriter()
+        params = face.scaled_params(self.scale)
+        tracker = face.FaceTracker(params=params) if self.mode == "track" else None
+        suspects = face.open_suspects(suspicion_addr)
+        monitor = self.monitor = face.FaceMonitor(self.scale, tracker, writer, draw=display is not None,
+                                                  suspects=suspects, session=session,
+                                                  candidate=candidate, bus=bus)
+        writer.start()
+        try:
+            face.detect_loop(monitor, self.frames, display, stop)
+        finally:
+            monitor.close()
+            writer.close()
+            suspects.close()
+        if not stop.is_set() and self.cap.live:
+            raise RuntimeError("camera stopped delivering frames")
+
+    def close(self):
+        self.closing.set()
+        if self.frames is not None:
+            self.frames.close()
+            self.capture.join()
+            self.cap.release()
+
+
+class VoiceWorker:
+    name = "voice"
+
+    def __init__(self, audio=None):
+        self.audio = audio
+        self.fmt = voice.AudioFormat()
+        self.source = None
+        self.threshold = None
+        self.monitor = None
+
+    def warm(self):
+        self.source = open_audio_source(self.fmt, self.audio)
+        self.threshold = voice.calibrate_background(self.source, 4) * 1.5
+
+    def run(self, stop, bus, **session):
+        monitor = self.monitor = voice.VoiceMonitor(self.threshold, self.fmt, bus=bus)
+        monitor.run(self.source, stop)
+        # the next session starts from the noise floor this one ended with
+        self.threshold = monitor.threshold
+
+    def close(self):
+        if self.source is not None and not self.source.live:
+            self.source.close()
+
+
+# ---------------------------------------------------------
+# SUPERVISOR (one process, one thread per monitor)
+# ---------------------------------------------------------
+
+class MonitorSupervisor:
+    """Runs the face and voice monitors as threads of this process, sharing
+    one interpreter, one copy of cv2/numpy and one EventBus.
+
+        sup = MonitorSupervisor(...)
+        sup.warm()                       # camera open, microphone calibrated
+        sup.start(session, candidate)    # monitoring one session
+        sup.wait_ready()                 # True once every monitor reported ready
+        sup.stop()                       # returns once both monitors have shut down
+        sup.start(...)                   # next session, no re-warm
+        sup.close()
+
+    A monitor that fails (no camera, no microphone) publishes "error" and
+    the other one keeps running."""
+
+    def __init__(self, face_enabled=True, voice_enabled=True, video=None, audio=None,
+                 scale=face.DETECT_SCALE, mode="full", display=False, bus=None):
+        self.bus = bus or EventBus()
+        self.show = display
+        self.display = None
+        self.stop_event = threading.Event()
+
+        self.workers = []
+        if face_enabled:
+            self.workers.append(FaceWorker(video, scale, mode))
+        if voice_enabled:
+            self.workers.append(VoiceWorker(audio))
+        self.warm_errors = {}
+        self.failed = False        # a monitor crashed during a session
+        self.ready = {}
+        self.errors = {}
+        self.ready_in = {}
+        self.threads = []
+        self.started = None
+        self._events = self.bus.subscribe()
+        self._watcher = threading.Thread(target=self._watch, name="monitor-bus", daemon=True)
+        self._watcher.start()
+
+    # ---------- lifecycle ----------
+    def warm(self):
+        """Warms every monitor in parallel; returns the seconds it took.
+        A monitor that fails to warm is left out of the sessions."""
+        t0 = time.perf_counter()
+
+        def warm_one(worker):
+            try:
+                worker.warm()
+            except Exception as e:
+                print(f"❌ {worker.name} monitor failed: {e}")
+                self.warm_errors[worker.name] = str(e)
+
+        threads = [threading.Thread(target=warm_one, args=(w,), name=f"{w.name}-warm") for w in self.workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - t0
+
+    def start(self, session=DEFAULT_SESSION, candidate="", suspicion_addr=None):
+        self.stop_event = threading.Event()
+        self.display = face.LatestFrame() if self.show else None
+        self.errors = dict(self.warm_errors)
+        self.ready_in = {}
+        self.ready = {w.name: threading.Event() for w in self.workers}
+        for name in self.warm_errors:
+            self.ready[name].set()
+        self.started = time.perf_counter()
+        self.threads = []
+        for worker in self.workers:
+            if worker.name in self.warm_errors:
+                continue
+            kwargs = {"session": session, "candidate": candidate, "suspicion_addr": suspicion_addr}
+            if worker.name == "face":
+                kwargs["display"] = self.display
+            thread = threading.Thread(target=self._guard, args=(worker, kwargs),
+                                      name=f"{worker.name}-monitor", daemon=True)
+            self.threads.append(thread)
+            thread.start()
+        return self
+
+    def wait_ready(self, timeout=READY_TIMEOUT):
+        """True when every monitor is running; False on timeout or if one failed."""
+        deadline = time.perf_counter() + timeout
+        for event in self.ready.values():
+            if not event.wait(max(deadline - time.perf_counter(), 0)):
+                return False
+        return not self.errors
+
+    def time_to_ready(self):
+        return max(self.ready_in.values()) if self.ready_in and not self.errors else None
+
+    def running(self):
+        return any(thread.is_alive() for thread in self.threads)
+
+    def join(self, timeout=None):
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """Ends the current session; the workers stay warm."""
+        self.stop_event.set()
+        self.join(timeout)
+        if self.display is not None:
+            self.display.close()
+        return not self.running()
+
+    def close(self, timeout=STOP_TIMEOUT):
+        clean = self.stop(timeout)
+        for worker in self.workers:
+            worker.close()
+        self.bus.publish("supervisor", "stopped")
+        self.bus.unsubscribe(self._events)
+        return clean
+
+    # ---------- internals ----------
+    def _watch(self):
+        while True:
+            event = self._events.get()
+            name = event["source"]
+            if name == "supervisor":
+                break
+            if event["kind"] == "ready" and name in self.ready:
+                self.ready_in[name] = time.perf_counter() - self.started
+                self.ready[name].set()
+            elif event["kind"] == "error" and name in self.ready:
+                self.errors[name] = event["data"]["error"]
+                self.ready[name].set()
+            elif event["kind"] == "stopped" and name in self.ready and not self.ready[name].is_set():
+                self.errors.setdefault(name, "stopped before it was ready")
+                self.ready[name].set()
+
+    def _guard(self, worker, kwargs):
+        try:
+            worker.run(self.stop_event, self.bus, **kwargs)
+        except Exception as e:
+            print(f"❌ {worker.name} monitor failed: {e}")
+            self.failed = True
+            self.bus.publish(worker.name, "error", {"error": str(e)})
+        finally:
+            self.bus.publish(worker.name, "stopped")
+
+    def health(self):
+        """Counters for the heartbeat: frames / windows analysed so far this session."""
+        status = {"session": self.running()}
+        for worker in self.workers:
+            if worker.monitor is not None:
+                status[worker.name] = worker.monitor.frames if worker.name == "face" else worker.monitor.windows
+        return status
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Face + voice monitoring in one process")
+    parser.add_argument("--no-face", dest="face", action="store_false")
+    parser.add_argument("--no-voice", dest="voice", action="store_false")
+    parser.add_argument("--video", help="video file instead of the camera")
+    parser.add_argument("--audio", help="audio file instead of the microphone")
+    parser.add_argument("--scale", type=float, default=face.DETECT_SCALE)
+    parser.add_argument("--mode", choices=["full", "track"], default="full")
+    parser.add_argument("--headless", action="store_true", help="no camera window")
+    parser.add_argument("--standby", action="store_true",
+                        help="warm up, then take LEASE/RELEASE commands on stdin (worker pool)")
+    parser.add_argument("--session", default=DEFAULT_SESSION, help="suspicion counter session")
+    parser.add_argument("--candidate", default="", help="candidate the suspicion counts belong to")
+    parser.add_argument("--suspicion-addr", help="host:port of the suspicion service")
+    args = parser.parse_args(argv)
+    if not (args.face or args.voice):
+        parser.error("nothing to monitor")
+    if not 0 < args.scale <= 1:
+        parser.error(f"--scale must be in (0, 1], got {args.scale}")
+    return args
+
+
+# ---------------------------------------------------------
+# CHILD PROCESS PROTOCOL (see launcher.py)
+# ---------------------------------------------------------
+# stdout:  WARM <seconds>          devices open / calibrated (--standby)
+#          READY <seconds>         session is being monitored
+#          FAILED <reason>         a monitor could not start
+#          RELEASED                session ended, worker is warm again
+#          HEARTBEAT {...}         every HEARTBEAT_INTERVAL (see MonitorSupervisor.health)
+# stdin:   LEASE {"session": ..., "candidate": ..., "suspicion_addr": ...}
+#          RELEASE
+# SIGTERM or end of stdin shuts the process down cleanly. Exit status 1
+# means a monitor crashed mid-session (e.g. the camera stopped delivering
+# frames); the parent restarts the process.
+
+def report_ready(supervisor, reported):
+    if supervisor.wait_ready():
+        print(f"READY {supervisor.time_to_ready():.2f}", flush=True)
+    else:
+        reason = "; ".join(f"{k}: {v}" for k, v in supervisor.errors.items()) or "timeout"
+        print(f"FAILED {reason}", flush=True)
+    reported.set()
+
+
+def heartbeat(supervisor, stop_event):
+    while not stop_event.wait(HEARTBEAT_INTERVAL):
+        print(f"HEARTBEAT {json.dumps(supervisor.health())}", flush=True)
+
+
+def read_commands(commands):
+    for line in sys.stdin:
+        commands.put(line.strip())
+    commands.put("EXIT")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+
+    os.makedirs(face.capture_dir, exist_ok=True)
+    supervisor = MonitorSupervisor(args.face, args.voice, args.video, args.audio, args.scale,
+                                   args.mode, not args.headless)
+    threading.Thread(target=heartbeat, args=(supervisor, stop_event), name="heartbeat", daemon=True).start()
+    warm_seconds = supervisor.warm()
+
+    commands = queue.Queue()
+    reported = threading.Event()
+    if args.standby:
+        print(f"WARM {warm_seconds:.2f}", flush=True)
+        threading.Thread(target=read_commands, args=(commands,), name="commands", daemon=True).start()
+    else:
+        supervisor.start(args.session, args.candidate, args.suspicion_addr)
+        # ✅ Readiness is reported from a thread so the main thread can keep the window alive
+        threading.Thread(target=report_ready, args=(supervisor, reported), name="ready", daemon=True).start()
+
+    leased = not args.standby
+    shown = False
+    while not stop_event.is_set():
+        display = supervisor.display if leased else None
+        if display is not None and display.closed:
+            display = None
+        try:
+            command = commands.get_nowait() if display is not None else commands.get(timeout=0.2)
+        except queue.Empty:
+            command = None
+
+        if command is not None:
+            op, _, payload = command.partition(" ")
+            if op == "LEASE" and not leased:
+                session = json.loads(payload or "{}")
+                reported.clear()
+                supervisor.start(session.get("session", DEFAULT_SESSION), session.get("candidate", ""),
+                                 session.get("suspicion_addr"))
+                threading.Thread(target=report_ready, args=(supervisor, reported), name="ready", daemon=True).start()
+                leased = True
+            elif op == "RELEASE" and leased:
+                supervisor.stop()
+                leased = False
+                print("RELEASED", flush=True)
+            elif op == "EXIT":
+                break
+            continue
+
+        # (only after READY/FAILED went out, so the parent always hears why)
+        if supervisor.failed and reported.is_set():
+            break
+
+        if leased and not supervisor.running() and reported.is_set():
+            if not args.standby:
+                break
+            # recorded source ran out mid-session
+            supervisor.stop()
+            leased = False
+            print("RELEASED", flush=True)
+
+        if display is None:
+            continue
+        frame = display.get(timeout=0.1)
+        if frame is None:
+            continue
+        cv2.imshow("Face Monitoring", frame)
+        shown = True
+        key = cv2.waitKey(1)
+        if key == ord('q') or key == ord('Q'):
+            print("👋 Monitoring stopped manually (Q pressed).")
+            break
+
+    t0 = time.perf_counter()
+    clean = supervisor.close()
+    if shown:
+        cv2.destroyAllWindows()
+    print(f"✅ Monitoring stopped in {time.perf_counter() - t0:.2f}s"
+          f"{'' if clean else ' (a monitor did not finish in time)'}")
+    if supervisor.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
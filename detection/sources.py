@@ -0,0 +1,122 @@
+import threading
+
+import cv2
+import numpy as np
+import soundfile as sf
+
+try:
+    import sounddevice as sd
+except (ImportError, OSError):   # no PortAudio: file sources still work
+    sd = None
+
+
+# ---------------------------------------------------------
+# FRAME SOURCES
+# ---------------------------------------------------------
+# read() -> (ok, frame), release(), opened(); `live` sources drop stale
+# frames, file-backed ones are read at whatever speed the consumer runs.
+
+class CameraSource:
+    live = True
+
+    def __init__(self, index=0, width=1280, height=720):
+        self.name = f"camera {index}"
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(3, width)
+        self.cap.set(4, height)
+        self.cap.set(cv2.CAP_PROP_AUTOFOCUS, 1)
+
+    def opened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(CameraSource):
+    live = False
+
+    def __init__(self, path):
+        self.name = path
+        self.cap = cv2.VideoCapture(path)
+
+
+def open_frame_source(path=None):
+    return VideoFileSource(path) if path else CameraSource()
+
+
+# ---------------------------------------------------------
+# AUDIO SOURCES
+# ---------------------------------------------------------
+# record(seconds) -> next `seconds` of mono audio (calibration, chunk mode)
+# live:  stream(blocksize, callback) context manager, callback(block) per block
+# files: blocks(blocksize) generator, as fast as the consumer pulls
+
+class MicrophoneSource:
+    live = True
+
+    def __init__(self, fmt):
+        if sd is None:
+            raise RuntimeError("sounddevice/PortAudio is not available for microphone capture")
+        self.name = "microphone"
+        self.fmt = fmt
+        self.status_flags = []
+
+    def record(self, seconds):
+        recording = sd.rec(int(seconds * self.fmt.rate), samplerate=self.fmt.rate,
+                           channels=1, dtype=self.fmt.dtype.name)
+        sd.wait()
+        return recording[:, 0]
+
+    def stream(self, blocksize, callback):
+        def on_audio(indata, frames, time_info, status):
+            if status:
+                self.status_flags.append(str(status))
+            callback(indata[:, 0])
+
+        return sd.InputStream(samplerate=self.fmt.rate, channels=1, dtype=self.fmt.dtype.name,
+                              blocksize=blocksize, callback=on_audio)
+
+
+class AudioFileSource:
+    """Reads a recorded session (WAV/FLAC/...) as the capture format.
+    The format's sample rate is set to the file's."""
+
+    live = False
+
+    def __init__(self, path, fmt):
+        self.name = path
+        self.file = sf.SoundFile(path)
+        self.fmt = fmt
+        fmt.rate = self.file.samplerate
+        self.status_flags = []
+        self.lock = threading.Lock()
+
+    def _read(self, frames):
+        with self.lock:
+            data = self.file.read(frames, dtype=self.fmt.dtype.name, always_2d=True)
+        if data.shape[1] > 1:
+            data = data.mean(axis=1).astype(self.fmt.dtype)
+        else:
+            data = data[:, 0]
+        return np.ascontiguousarray(data)
+
+    def record(self, seconds):
+        return self._read(int(seconds * self.fmt.rate))
+
+    def blocks(self, blocksize):
+        while True:
+            block = self._read(blocksize)
+            if len(block) == 0:
+                return
+            yield block
+
+    def close(self):
+        self.file.close()
+
+
+def open_audio_source(fmt, path=None):
+    return AudioFileSource(path, fmt) if path else MicrophoneSource(fmt)
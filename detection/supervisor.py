@@ -0,0 +1,235 @@
+import asyncio
+import json
+import signal
+import sys
+import threading
+import time
+
+
+# Event-driven supervision of the monitor (and quiz) child processes:
+# no polling and no fixed sleeps -- every wait is on a child's output line,
+# its exit, or a timeout.
+
+HEARTBEAT_TIMEOUT = 5.0  # seconds without a HEARTBEAT line before a child is killed
+RESTART_BACKOFF = 0.5    # first restart delay, doubled per crash ...
+MAX_BACKOFF = 30.0       # ... up to this
+STABLE_AFTER = 60.0      # a child up this long resets the backoff
+
+
+class ManagedProcess:
+    """One supervised child process.
+
+    Protocol lines on the child's stdout (see monitor.py) update state and
+    wake waiters; anything else is passed through. When the child exits,
+    `on_exit(child, returncode, restarting)` callbacks run; a crash
+    (nonzero exit, or heartbeats stopped) is restarted with exponential
+    backoff when restart=True, and a leased standby worker is re-leased to
+    the same session once it is warm again."""
+
+    def __init__(self, name, argv, restart=True, heartbeat_timeout=HEARTBEAT_TIMEOUT,
+                 standby=False, cwd=None, protocol=True):
+        self.name = name
+        self.argv = list(argv)
+        self.restart = restart
+        self.heartbeat_timeout = heartbeat_timeout if protocol else None
+        self.standby = standby
+        self.cwd = cwd
+        self.protocol = protocol
+        self.proc = None
+        self.task = None
+        self.on_exit = []
+        self.restarts = 0
+        self.returncode = None
+        self.session = None          # current LEASE payload (standby)
+        self.heartbeat = None        # last HEARTBEAT payload
+        self.last_beat = None
+        self.stopping = False
+        self.released = False
+
+        self.spawned = None
+        self.leased = None
+        self.warm_in = None
+        self.ready_in = None
+        self.failure = None
+        self.cond = asyncio.Condition()
+        self.exited = asyncio.Event()
+
+    # ---------- lifecycle ----------
+    async def start(self):
+        self.stopping = False
+        self.exited.clear()
+        await self._spawn()
+        self.task = asyncio.create_task(self._supervise(), name=f"supervise-{self.name}")
+        return self
+
+    async def _spawn(self):
+        async with self.cond:
+            self.spawned = time.perf_counter()
+            self.warm_in = self.ready_in = self.failure = None
+            self.released = False
+            self.last_beat = time.monotonic()
+        self.proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-u", *self.argv,
+            stdin=asyncio.subprocess.PIPE if self.standby else None,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, cwd=self.cwd,
+        )
+
+    async def _supervise(self):
+        backoff = RESTART_BACKOFF
+        while True:
+            started = time.monotonic()
+            reader = asyncio.create_task(self._read())
+            watchdog = asyncio.create_task(self._watchdog()) if self.heartbeat_timeout else None
+            returncode = await self.proc.wait()
+            await reader
+            if watchdog is not None:
+                watchdog.cancel()
+
+            self.returncode = returncode
+            crashed = returncode != 0 and not self.stopping
+            restarting = crashed and self.restart
+            async with self.cond:
+                self.cond.notify_all()
+            for callback in self.on_exit:
+                callback(self, returncode, restarting)
+            if not restarting:
+                self.exited.set()
+                return
+
+            if time.monotonic() - started > STABLE_AFTER:
+                backoff = RESTART_BACKOFF
+            print(f"🔁 {self.name} exited with {returncode}, restarting in {backoff:g}s")
+            try:
+                # backoff only on the crash path; stop() cancels it straight away
+                await asyncio.wait_for(self._stop_requested(), backoff)
+                self.exited.set()
+                return
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, MAX_BACKOFF)
+            self.restarts += 1
+            await self._spawn()
+            if self.session is not None:
+                asyncio.create_task(self._lease_again())
+
+    async def _stop_requested(self):
+        async with self.cond:
+            await self.cond.wait_for(lambda: self.stopping)
+
+    async def _lease_again(self):
+        if await self.wait_warm():
+            await self._send("LEASE " + json.dumps(self.session))
+
+    async def _read(self):
+        async for raw in self.proc.stdout:
+            line = raw.decode(errors="replace")
+            if self.protocol:
+                if line.startswith("HEARTBEAT"):
+                    self.last_beat = time.monotonic()
+                    self.heartbeat = json.loads(line.split(" ", 1)[1])
+                    continue
+                async with self.cond:
+                    start = self.leased or self.spawned
+                    if line.startswith("WARM"):
+                        self.warm_in = time.perf_counter() - self.spawned
+                    elif line.startswith("READY"):
+                        self.ready_in = time.perf_counter() - start
+                    elif line.startswith("FAILED"):
+                        self.failure = line.split(" ", 1)[-1].strip()
+                    elif line.startswith("RELEASED"):
+                        self.released = True
+                    self.cond.notify_all()
+            sys.stdout.write(line)
+            sys.stdout.flush()
+
+    async def _watchdog(self):
+        while True:
+            remaining = self.last_beat + self.heartbeat_timeout - time.monotonic()
+            if remaining <= 0:
+                print(f"⚠️ {self.name}: no heartbeat for {self.heartbeat_timeout:g}s, killing it")
+                self.proc.kill()
+                return
+            await asyncio.sleep(remaining)
+
+    # ---------- waits ----------
+    async def _wait(self, predicate, timeout):
+        async with self.cond:
+            try:
+                await asyncio.wait_for(
+                    self.cond.wait_for(lambda: predicate() or self.proc.returncode is not None), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return predicate()
+
+    async def wait_warm(self, timeout=None):
+        return await self._wait(lambda: self.warm_in is not None, timeout)
+
+    async def wait_ready(self, timeout=None):
+        await self._wait(lambda: self.ready_in is not None or self.failure is not None, timeout)
+        return self.ready_in is not None
+
+    async def wait_exit(self):
+        await self.exited.wait()
+        return self.returncode
+
+    def running(self):
+        return self.proc is not None and self.proc.returncode is None
+
+    # ---------- commands ----------
+    async def _send(self, line):
+        try:
+            self.proc.stdin.write((line + "\n").encode())
+            await self.proc.stdin.drain()
+            return True
+        except (OSError, ConnectionError, AttributeError):
+            return False
+
+    async def lease(self, session, candidate="", suspicion_addr=None):
+        async with self.cond:
+            self.session = {"session": session, "candidate": candidate, "suspicion_addr": suspicion_addr}
+            self.leased = time.perf_counter()
+            self.ready_in = self.failure = None
+            self.released = False
+        return await self._send("LEASE " + json.dumps(self.session))
+
+    async def release(self, timeout=None):
+        self.session = None
+        return await self._send("RELEASE") and await self._wait(lambda: self.released, timeout)
+
+    async def stop(self, timeout=None):
+        """SIGTERM (no restart), then wait for the child to exit; kill after `timeout`."""
+        async with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        if self.running():
+            self.proc.send_signal(signal.SIGTERM)
+            try:
+                await asyncio.wait_for(self.proc.wait(), timeout)
+            except asyncio.TimeoutError:
+                self.proc.kill()
+        if self.task is not None:
+            await self.task
+        return self.returncode
+
+
+# ---------------------------------------------------------
+# BACKGROUND LOOP (for synchronous callers: Streamlit, launcher.py)
+# ---------------------------------------------------------
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def background_loop():
+    """An event loop running in a daemon thread, started once per process."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="supervisor-loop", daemon=True).start()
+        return _loop
+
+
+def call(coro, timeout=None):
+    """Runs `coro` on the background loop and waits for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, background_loop()).result(timeout)
@@ -0,0 +1,377 @@
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SESSIONS_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "suspicion"))
+
+DEFAULT_SESSION = "current"
+FLUSH_INTERVAL = 2.0     # seconds between disk flushes
+SESSION_TTL = 3600       # idle sessions are dropped from memory (their file stays) after this
+FILE_TTL = 7 * 24 * 3600 # files of sessions never finished (abandoned attempts) are deleted after this
+PRUNE_INTERVAL = 300     # seconds between scans of the directory for abandoned session files
+SHARDS = 32              # independent locks; sessions hash onto them
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+def format_address(address):
+    return f"{address[0]}:{address[1]}"
+
+
+def session_id(username, attempt_id):
+    return f"{username}-{attempt_id}"
+
+
+def _safe_name(session):
+    # percent-encoding is reversible, so two sessions never share a file
+    return quote(session, safe="")
+
+
+# ---------------------------------------------------------
+# COUNTER
+# ---------------------------------------------------------
+
+class _Shard:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}     # session -> candidate -> event -> count
+        self.totals = {}     # session -> total count
+        self.touched = {}    # session -> last update (monotonic)
+        self.dirty = set()
+        self.io = threading.Lock()   # file writes/deletes of this shard's sessions (not held by add)
+
+
+class SuspicionCounter:
+    """Suspicion counts per (session, candidate, event type), kept in memory
+    and flushed every `flush_interval` seconds, one file per session written
+    with an atomic rename. Sessions hash onto `shards` independently locked
+    shards, so hundreds of monitored sessions don't contend on one lock,
+    and a session's total is a single dict lookup."""
+
+    def __init__(self, directory=SESSIONS_DIR, flush_interval=FLUSH_INTERVAL, shards=SHARDS, prune=True):
+        self.directory = directory
+        self.prune = prune    # only the process that owns `directory` deletes abandoned files
+        self.flush_interval = flush_interval
+        self.shards = [_Shard() for _ in range(shards)]
+        self.stopped = threading.Event()
+        self.flusher = None
+        self.pruned = None    # monotonic time of the last prune_files()
+        os.makedirs(directory, exist_ok=True)
+
+    def _shard(self, session):
+        return self.shards[hash(session) % len(self.shards)]
+
+    def _path(self, session):
+        return os.path.join(self.directory, f"{_safe_name(session)}.json")
+
+    def _ensure_loaded(self, shard, session):
+        # caller holds shard.lock; restores a session flushed before a restart
+        if session in shard.counts:
+            return
+        try:
+            with open(self._path(session), "r", encoding="utf-8") as f:
+                counts = json.load(f).get("counts", {})
+        except (OSError, json.JSONDecodeError):
+            counts = {}
+        shard.counts[session] = counts
+        shard.totals[session] = sum(n for events in counts.values() for n in events.values())
+        shard.touched[session] = time.monotonic()
+
+    def add(self, session, candidate, event, n=1):
+        shard = self._shard(session)
+        with shard.lock:
+            self._ensure_loaded(shard, session)
+            events = shard.counts[session].setdefault(candidate, {})
+            events[event] = events.get(event, 0) + n
+            shard.totals[session] += n
+            shard.touched[session] = time.monotonic()
+            shard.dirty.add(session)
+
+    def events(self, session, candidate=None):
+        shard = self._shard(session)
+        with shard.lock:
+            self._ensure_loaded(shard, session)
+            candidates = shard.counts[session]
+            if candidate is not None:
+                return dict(candidates.get(candidate, {}))
+            merged = {}
+            for events in candidates.values():
+                for event, n in events.items():
+                    merged[event] = merged.get(event, 0) + n
+            return merged
+
+    def total(self, session, candidate=None):
+        if candidate is not None:
+            return sum(self.events(session, candidate).values())
+        shard = self._shard(session)
+        with shard.lock:
+            self._ensure_loaded(shard, session)
+            return shard.totals[session]
+
+    def reset(self, session, candidate=None):
+        shard = self._shard(session)
+        with shard.lock:
+            self._ensure_loaded(shard, session)
+            if candidate is None:
+                shard.counts[session] = {}
+            else:
+                shard.counts[session].pop(candidate, None)
+            shard.totals[session] = sum(
+                n for events in shard.counts[session].values() for n in events.values()
+            )
+            shard.dirty.add(session)
+
+    def finish(self, session):
+        """The session's attempt is recorded: forget it and delete its file."""
+        shard = self._shard(session)
+        with shard.io:
+            with shard.lock:
+                for table in (shard.counts, shard.totals, shard.touched):
+                    table.pop(session, None)
+                shard.dirty.discard(session)
+            try:
+                os.remove(self._path(session))
+            except FileNotFoundError:
+                pass
+
+    # ---------- persistence ----------
+    def flush(self):
+        """Writes every session changed since the last flush, then drops
+        sessions idle for longer than SESSION_TTL from memory (their file
+        is kept, so total() still finds them) and, every PRUNE_INTERVAL,
+        deletes files of sessions abandoned for FILE_TTL."""
+        now = time.monotonic()
+        for shard in self.shards:
+            with shard.io:
+                with shard.lock:
+                    batch = {session: json.dumps({"session": session, "counts": shard.counts[session]})
+                             for session in shard.dirty}
+                    shard.dirty.clear()
+                    idle = [session for session, t in shard.touched.items()
+                            if now - t > SESSION_TTL and session not in batch]
+                    for session in idle:
+                        del shard.counts[session], shard.totals[session], shard.touched[session]
+
+                for session, payload in batch.items():
+                    path = self._path(session)
+                    tmp = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp, "w", encoding="utf-8") as f:
+                        f.write(payload)
+                    os.replace(tmp, path)
+
+        if self.prune and (self.pruned is None or now - self.pruned >= PRUNE_INTERVAL):
+            self.pruned = now
+            self.prune_files()
+
+    def prune_files(self, ttl=FILE_TTL):
+        """Deletes session files not written for `ttl` seconds (attempts
+        never finished, also from earlier runs); sessions still in memory
+        are kept."""
+        live = set()
+        for shard in self.shards:
+            with shard.lock:
+                live.update(self._path(session) for session in shard.counts)
+        cutoff = time.time() - ttl
+        removed = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json") or entry.path in live:
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def start(self):
+        if self.flusher is None:
+            self.flusher = threading.Thread(target=self._flush_loop, name="suspicion-flush", daemon=True)
+            self.flusher.start()
+        return self
+
+    def _flush_loop(self):
+        while not self.stopped.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self.stopped.set()
+        if self.flusher is not None:
+            self.flusher.join()
+        self.flush()
+
+
+# ---------------------------------------------------------
+# LOCAL SOCKET SERVICE
+# ---------------------------------------------------------
+# One JSON object per line:
+#   {"op": "add", "session": s, "candidate": c, "event": e, "n": 1}   (no reply)
+#   {"op": "get", "session": s, "candidate": c}  -> {"total": n, "events": {...}}
+#   {"op": "reset", "session": s, "candidate": c} -> {"ok": true}
+#   {"op": "finish", "session": s}                -> {"ok": true}
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        counter = self.server.counter
+        for line in self.rfile:
+            try:
+                msg = json.loads(line)
+                op = msg["op"]
+                session = msg.get("session", DEFAULT_SESSION)
+                candidate = msg.get("candidate")
+            except (ValueError, KeyError):
+                continue
+
+            if op == "add":
+                counter.add(session, candidate or "", msg.get("event", "suspect"), msg.get("n", 1))
+                continue
+            if op == "get":
+                events = counter.events(session, candidate)
+                reply = {"total": sum(events.values()), "events": events}
+            elif op == "reset":
+                counter.reset(session, candidate)
+                reply = {"ok": True}
+            elif op == "finish":
+                counter.finish(session)
+                reply = {"ok": True}
+            else:
+                reply = {"error": f"unknown op {op}"}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+
+
+class SuspicionServer(socketserver.ThreadingTCPServer):
+    """Exposes a SuspicionCounter to the monitor processes on localhost."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, counter, address=("127.0.0.1", 0)):
+        super().__init__(address, _Handler)
+        self.counter = counter
+        self.thread = None
+
+    @property
+    def address(self):
+        return self.server_address[:2]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, name="suspicion-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class SuspicionClient:
+    """Talks to a SuspicionServer. If the service is unreachable, events are
+    counted in a local SuspicionCounter instead of being lost."""
+
+    def __init__(self, address, fallback=None):
+        self.address = address
+        self.fallback = fallback
+        self.lock = threading.Lock()
+        self.sock = None
+        self.reader = None
+
+    def _connect(self):
+        if self.sock is None:
+            self.sock = socket.create_connection(self.address, timeout=2)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.reader = self.sock.makefile("rb")
+
+    def _send(self, msg, reply=False):
+        line = (json.dumps(msg) + "\n").encode()
+        with self.lock:
+            for attempt in range(2):
+                try:
+                    self._connect()
+                    self.sock.sendall(line)
+                    return json.loads(self.reader.readline()) if reply else None
+                except (OSError, ValueError):
+                    self._disconnect()
+            raise ConnectionError(f"suspicion service unreachable at {format_address(self.address)}")
+
+    def _disconnect(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+        self.reader = None
+
+    def add(self, session, candidate, event, n=1):
+        try:
+            self._send({"op": "add", "session": session, "candidate": candidate, "event": event, "n": n})
+        except ConnectionError:
+            if self.fallback is None:
+                raise
+            self.fallback.add(session, candidate, event, n)
+
+    def events(self, session, candidate=None):
+        return self._send({"op": "get", "session": session, "candidate": candidate}, reply=True)["events"]
+
+    def total(self, session, candidate=None):
+        return sum(self.events(session, candidate).values())
+
+    def reset(self, session, candidate=None):
+        self._send({"op": "reset", "session": session, "candidate": candidate}, reply=True)
+
+    def finish(self, session):
+        self._send({"op": "finish", "session": session}, reply=True)
+
+    def close(self):
+        with self.lock:
+            self._disconnect()
+        if self.fallback is not None:
+            self.fallback.close()
+
+
+# ---------------------------------------------------------
+# PROCESS-WIDE SERVICE
+# ---------------------------------------------------------
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def shared_service(directory=SESSIONS_DIR):
+    """Starts (once per process) the counter + server. Returns
+    (counter, "host:port") -- pass the address to the monitors."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            counter = SuspicionCounter(directory)
+            counter.start()
+            server = SuspicionServer(counter).start()
+            _service = (counter, format_address(server.address))
+        return _service
+
+
+if __name__ == "__main__":
+    # Standalone service: python suspicion.py [host:port]
+    address = parse_address(sys.argv[1]) if len(sys.argv) > 1 else ("127.0.0.1", 8765)
+    counter = SuspicionCounter()
+    counter.start()
+    server = SuspicionServer(counter, address)
+    print(f"✅ Suspicion service listening on {format_address(server.address)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        counter.close()
@@ -1,19 +1,49 @@
-import sounddevice as sd
 import numpy as np
 import time
 import os
 import soundfile as sf
 import signal
 import sys
+import argparse
+import threading
+import queue
+
+from sources import open_audio_source
+
+# ✅ Capture format: 16 kHz int16 is plenty for a loudness/voice check
+# (--rate 44100 --dtype float64 gives the old capture)
+SAMPLE_RATE = 16000
+SAMPLE_DTYPE = "int16"
+CLIP_CODEC = "pcm16"     # pcm16 (WAV), flac, or float (32-bit float WAV)
+
+CODECS = {
+    "pcm16": {"format": "WAV", "subtype": "PCM_16", "ext": ".wav"},
+    "flac": {"format": "FLAC", "subtype": "PCM_16", "ext": ".flac"},
+    "float": {"format": "WAV", "subtype": "FLOAT", "ext": ".wav"},
+}
+
+# ✅ Streaming mode settings
+WINDOW_SECONDS = 1.0     # audio per RMS window
+HOP_SECONDS = 0.1        # new window every hop (windows overlap, no gaps)
+RING_SECONDS = 5         # preallocated history kept by the input callback
+PRE_TRIGGER_SECONDS = 2  # audio kept before the loud window in evidence clips
+POST_TRIGGER_SECONDS = 1 # audio recorded after the trigger
+CLIP_QUEUE_SIZE = 16     # pending evidence clips before new ones are dropped
+
+# ✅ Voice activity detection (stream mode)
+THRESHOLD_RATIO = 1.5    # loud = window RMS above noise floor * ratio
+FLOOR_RISE = 0.995       # per-window EMA weight when the level is above the floor
+FLOOR_FALL = 0.9         # ... and below it (floor drops quickly, rises slowly)
+SPEECH_BAND = (100, 4000) # Hz: voice fundamentals + formants
+SPEECH_RATIO = 0.6       # share of a hop's energy inside the speech band
+MAX_FLATNESS = 0.4       # spectral flatness in the band (clicks/hiss are near 1)
+MIN_VOICED = 0.3         # share of voiced hops for a window to count as speech
+STATS_INTERVAL = 10      # seconds between VAD timing reports
 
 # ✅ Shutdown handler for Streamlit stop
-stop_signal = False
+stop_event = threading.Event()
 def handle_exit(signum, frame):
-    global stop_signal
-    stop_signal = True
-
-signal.signal(signal.SIGTERM, handle_exit)
-signal.signal(signal.SIGINT, handle_exit)
+    stop_event.set()
 
 # ✅ Mac-Friendly Beep Function
 def play_beep():
@@ -26,63 +56,479 @@ base_dir = os.path.dirname(os.path.abspath(__file__))
 capture_dir = os.path.join(base_dir, "audio_captures")
 os.makedirs(capture_dir, exist_ok=True)
 
+class AudioFormat:
+    """Sample rate, sample type and evidence codec used by the monitor.
+    RMS values are always on the float full-scale (-1..1) range, so
+    thresholds mean the same thing whatever the sample type."""
+
+    def __init__(self, rate=SAMPLE_RATE, dtype=SAMPLE_DTYPE, codec=CLIP_CODEC):
+        self.rate = rate
+        self.dtype = np.dtype(dtype)
+        self.codec = codec
+        if self.dtype.kind == "i":
+            self.scale = 1.0 / -np.iinfo(self.dtype).min
+        else:
+            self.scale = 1.0
+
+    def rms(self, recording):
+        return np.sqrt(np.mean(np.square(recording, dtype=np.float64))) * self.scale
+
+    def write(self, file_path, recording):
+        codec = CODECS[self.codec]
+        sf.write(file_path, recording, self.rate, format=codec["format"], subtype=codec["subtype"])
+
+    def clip_path(self):
+        timestamp = time.strftime('%Y%m%d_%H%M%S')
+        return os.path.join(capture_dir, f"sound_{timestamp}{CODECS[self.codec]['ext']}")
+
+
 # ✅ Calibrate background noise
-def calibrate_background(duration=4):
+def calibrate_background(source, duration=4):
+    fmt = source.fmt
     print(f"🔊 Calibrating ambient noise for {duration} seconds... please stay quiet.")
-    recording = sd.rec(int(duration * 44100), samplerate=44100, channels=1, dtype='float64')
-    sd.wait()
+    recording = source.record(duration)
 
-    bg_level = np.sqrt(np.mean(recording ** 2))
+    bg_level = fmt.rms(recording)
     print(f"✅ Background noise level: {bg_level:.6f}")
     return bg_level
 
+# ✅ Save suspicious audio
+def save_sound(recording, fmt, writer=None):
+    file_path = fmt.clip_path()
+
+    if writer is not None:
+        if not writer.submit(file_path, recording):
+            print(f"⚠️ Clip queue full, dropped: {file_path}")
+        return
+
+    fmt.write(file_path, recording)
+    print(f"💾 Saved suspicious audio: {file_path}")
+
+
+def alert_sound(volume):
+    print(f"⚠️ Sound detected! Volume: {volume:.4f}")
+    play_beep()
+
+
+class ClipWriter(threading.Thread):
+    """Writes evidence WAVs off the capture/analysis path."""
+
+    def __init__(self, fmt, maxsize=CLIP_QUEUE_SIZE):
+        super().__init__(name="clip-writer", daemon=True)
+        self.fmt = fmt
+        self.queue = queue.Queue(maxsize)
+        self.dropped = 0
+
+    def submit(self, file_path, recording):
+        try:
+            self.queue.put_nowait((file_path, recording))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            file_path, recording = item
+            self.fmt.write(file_path, recording)
+            print(f"💾 Saved suspicious audio: {file_path}")
+
+    def close(self):
+        self.queue.put(None)
+        self.join()
+
 # ✅ Sound detection loop
-def detect_sound(threshold, duration=1):
+def detect_sound(threshold, source, duration=1, stop=stop_event):
+    fmt = source.fmt
     print("\n🎤 Voice monitoring started! (auto-stops when quiz ends)\n")
 
-    while not stop_signal:
+    while not stop.is_set():
         try:
             # record a small chunk
-            recording = sd.rec(
-                int(duration * 44100), 
-                samplerate=44100, 
-                channels=1, 
-                dtype='float64'
-            )
-            sd.wait()
+            recording = source.record(duration)
+            if len(recording) == 0:
+                break
 
-            volume = np.sqrt(np.mean(recording ** 2))
+            volume = fmt.rms(recording)
 
-            if stop_signal:
+            if stop.is_set():
                 print("🛑 Voice monitoring stopping...")
                 break
 
             if volume > threshold:
-                print(f"⚠️ Sound detected! Volume: {volume:.4f}")
-
-                timestamp = time.strftime('%Y%m%d_%H%M%S')
-                file_path = os.path.join(capture_dir, f"sound_{timestamp}.wav")
-
-                sf.write(file_path, recording, 44100)
-                print(f"💾 Saved suspicious audio: {file_path}")
-
-                play_beep()
+                alert_sound(volume)
+                save_sound(recording, fmt)
 
             else:
                 print(f"...quiet... ({volume:.6f})")
 
-            time.sleep(0.4)
+            if source.live:
+                time.sleep(0.4)
 
         except Exception as e:
             print("⚠️ Error:", e)
             time.sleep(1)
 
-try:
-    bg = calibrate_background(4)
-    threshold = bg * 1.5  # sensitivity
-    detect_sound(threshold)
 
-except Exception as e:
-    print("❌ Fatal Error:", e)
+# ---------------------------------------------------------
+# STREAMING MODE
+# ---------------------------------------------------------
+
+class AudioRing:
+    """Preallocated mono ring buffer written by the InputStream callback.
+    Its length is a whole number of hops, so every hop is one contiguous
+    slice and `hops_view[i]` is hop i (mod ring size) without copying."""
+
+    def __init__(self, hops, hop, dtype=np.float64):
+        self.hop = hop
+        self.hops = hops
+        self.buf = np.zeros(hops * hop, dtype)
+        self.hops_view = self.buf.reshape(hops, hop)
+        self.written = 0
+        self.cond = threading.Condition()
+
+    def write(self, block):
+        size = len(self.buf)
+        total = len(block)
+        block = block[-size:]
+        n = len(block)
+        start = (self.written + total - n) % size
+        first = min(n, size - start)
+        self.buf[start:start + first] = block[:first]
+        if first < n:
+            self.buf[:n - first] = block[first:]
+        with self.cond:
+            self.written += total
+            self.cond.notify_all()
+
+    def wait(self, samples, timeout=None):
+        with self.cond:
+            return self.cond.wait_for(lambda: self.written >= samples, timeout)
+
+    def read(self, start, end):
+        """Copy of absolute samples [start, end), clipped to what is still
+        in the ring (used for evidence only)."""
+        size = len(self.buf)
+        start = max(start, self.written - size, 0)
+        end = min(end, self.written)
+        n = max(end - start, 0)
+        first = start % size
+        if first + n <= size:
+            return self.buf[first:first + n].copy()
+        return np.concatenate((self.buf[first:], self.buf[:n - (size - first)]))
+
+
+class NoiseFloor:
+    """Exponential moving estimate of the background RMS, fed with windows
+    that are not speech, so HVAC/room changes move the threshold."""
+
+    def __init__(self, level):
+        self.level = level
+
+    def update(self, rms):
+        alpha = FLOOR_RISE if rms > self.level else FLOOR_FALL
+        self.level = alpha * self.level + (1 - alpha) * rms
+
+    def threshold(self):
+        return self.level * THRESHOLD_RATIO
+
+
+class SpectralVAD:
+    """Marks each hop voiced or not from band-energy features, computed
+    with one FFT over every newly completed run of hops in the ring.
+
+    A hop is voiced when it is loud relative to the noise floor, most of
+    its energy is in the speech band, and that band is not flat (broadband
+    clicks and hiss are)."""
+
+    def __init__(self, ring, rate, floor, scale=1.0):
+        self.floor = floor
+        self.scale = scale
+        self.voiced = np.zeros(ring.hops, dtype=bool)
+        self.taper = np.hanning(ring.hop)
+        freqs = np.fft.rfftfreq(ring.hop, 1 / rate)
+        self.band = (freqs >= SPEECH_BAND[0]) & (freqs <= SPEECH_BAND[1])
+        self.busy = 0.0
+        self.hops = 0
+
+    def analyse(self, block, first, last, energies):
+        t0 = time.perf_counter()
+
+        spectrum = np.fft.rfft(block * self.taper, axis=1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        band = power[:, self.band] + 1e-12
+
+        band_share = band.sum(axis=1) / (power.sum(axis=1) + 1e-12)
+        flatness = np.exp(np.log(band).mean(axis=1)) / band.mean(axis=1)
+        loud = np.sqrt(energies / block.shape[1]) * self.scale > self.floor.threshold()
+
+        self.voiced[first:last] = loud & (band_share > SPEECH_RATIO) & (flatness < MAX_FLATNESS)
+
+        self.busy += time.perf_counter() - t0
+        self.hops += last - first
+
+    def report(self):
+        if self.hops:
+            print(f"📊 VAD {self.busy / self.hops * 1e6:.0f} µs/window, "
+                  f"noise floor {self.floor.level:.6f}")
+        self.busy = 0.0
+        self.hops = 0
+
+
+class SlidingRMS:
+    """RMS over the last `window_hops` hops, advanced hop by hop.
+
+    Hop energies for every newly completed run of hops are computed in one
+    einsum over the ring's 2-D view, straight into a preallocated array;
+    the window sum is then updated incrementally. With a SpectralVAD the
+    same block is classified and the window's voiced share is tracked too."""
+
+    def __init__(self, ring, window_hops, scale=1.0, vad=None):
+        self.ring = ring
+        self.window_hops = window_hops
+        self.scale = scale
+        self.vad = vad
+        self.voiced_hops = 0
+        self.energies = np.zeros(ring.hops)
+        self.next_hop = 0           # absolute index of the next hop to analyse
+        self.start_hop = 0          # first hop of the current unbroken run
+        self.window_energy = 0.0
+        self.skipped = 0
+
+    def samples_needed(self):
+        return (self.next_hop + 1) * self.ring.hop
+
+    def advance(self):
+        """Yields (hop_index, rms, voiced_share) for every complete hop not
+        analysed yet; voiced_share is None without a VAD."""
+        ring = self.ring
+        available = ring.written // ring.hop
+
+        # fell so far behind that the callback overwrote unread hops:
+        # restart from the oldest hop still in the ring
+        oldest = available - ring.hops
+        if self.next_hop < oldest:
+            self.skipped += oldest - self.next_hop
+            self.next_hop = self.start_hop = oldest
+            self.window_energy = 0.0
+            self.voiced_hops = 0
+
+        # at most ring.hops - window_hops hops per block: a longer block would
+        # overwrite the energies (and VAD flags) of hops that still have to
+        # leave the window, and the running sum would drift
+        step = ring.hops - self.window_hops
+        while self.next_hop < available:
+            first = self.next_hop % ring.hops
+            last = min(first + min(available - self.next_hop, step), ring.hops)
+            block = ring.hops_view[first:last]
+            np.einsum("ij,ij->i", block, block, out=self.energies[first:last], dtype=np.float64)
+            if self.vad is not None:
+                self.vad.analyse(block, first, last, self.energies[first:last])
+
+            for slot in range(first, last):
+                hop_index = self.next_hop
+                self.window_energy += self.energies[slot]
+                if self.vad is not None:
+                    self.voiced_hops += self.vad.voiced[slot]
+                if hop_index - self.window_hops >= self.start_hop:
+                    old = (slot - self.window_hops) % ring.hops
+                    self.window_energy -= self.energies[old]
+                    if self.vad is not None:
+                        self.voiced_hops -= self.vad.voiced[old]
+                self.next_hop += 1
+
+                if hop_index + 1 - self.start_hop >= self.window_hops:
+                    energy = max(self.window_energy, 0.0)
+                    voiced = self.voiced_hops / self.window_hops if self.vad is not None else None
+                    yield hop_index, np.sqrt(energy / (self.window_hops * ring.hop)) * self.scale, voiced
+
+
+class PendingClips:
+    """Evidence clips waiting for their post-trigger audio. A trigger that
+    overlaps a pending clip extends it instead of starting a second one."""
+
+    def __init__(self, ring, fmt, writer):
+        self.ring = ring
+        self.fmt = fmt
+        self.writer = writer
+        self.clips = []
+
+    def add(self, start, end):
+        if self.clips and start <= self.clips[-1][1]:
+            self.clips[-1][1] = max(self.clips[-1][1], end)
+        else:
+            self.clips.append([start, end])
+
+    def flush(self, force=False):
+        while self.clips and (force or self.ring.written >= self.clips[0][1]):
+            start, end = self.clips.pop(0)
+            save_sound(self.ring.read(start, end), self.fmt, self.writer)
+
+
+class VoiceMonitor:
+    """Stream-mode analysis: feed() blocks of samples into the ring (from
+    the input callback or a file), process() every complete window.
+
+    With vad=True, `threshold` only seeds the noise floor: the threshold
+    then follows the floor and only speech windows are captured."""
+
+    def __init__(self, threshold, fmt, window=WINDOW_SECONDS, hop=HOP_SECONDS,
+                 pre=PRE_TRIGGER_SECONDS, post=POST_TRIGGER_SECONDS, vad=True, bus=None):
+        self.threshold = threshold
+        self.bus = bus
+        self.hop_samples = int(hop * fmt.rate)
+        self.window_hops = max(1, round(window / hop))
+        self.pre_samples = int(pre * fmt.rate)
+        self.post_samples = int(post * fmt.rate)
+
+        # the ring must still hold pre-trigger audio once post-trigger audio is in
+        ring_seconds = max(RING_SECONDS, pre + window + post + 2 * hop)
+        ring_hops = max(int(np.ceil(ring_seconds / hop)), 2 * self.window_hops)
+
+        self.ring = AudioRing(ring_hops, self.hop_samples, fmt.dtype)
+        self.floor = NoiseFloor(threshold / THRESHOLD_RATIO)
+        self.vad = SpectralVAD(self.ring, fmt.rate, self.floor, fmt.scale) if vad else None
+        self.rms = SlidingRMS(self.ring, self.window_hops, fmt.scale, self.vad)
+        self.stats_hops = max(1, round(STATS_INTERVAL / hop))
+        self.writer = ClipWriter(fmt)
+        self.clips = PendingClips(self.ring, fmt, self.writer)
+        self.rearm_at = 0
+        self.windows = 0
+        self.events = 0
+        self.writer.start()
+
+    def feed(self, block):
+        self.ring.write(block)
+
+    def wait(self, timeout=None):
+        return self.ring.wait(self.rms.samples_needed(), timeout)
+
+    def process(self):
+        window_hops = self.window_hops
+        for hop_index, volume, voiced in self.rms.advance():
+            self.windows += 1
+            speech = voiced is None or voiced >= MIN_VOICED
+            if self.vad is not None:
+                self.threshold = self.floor.threshold()
+                if not speech:
+                    self.floor.update(volume)
+
+            if volume > self.threshold and speech and hop_index >= self.rearm_at:
+                self.events += 1
+                alert_sound(volume)
+                if self.bus is not None:
+                    self.bus.publish("voice", "alert", {"volume": float(volume)})
+                trigger_end = (hop_index + 1) * self.hop_samples
+                self.clips.add(trigger_end - window_hops * self.hop_samples - self.pre_samples,
+                               trigger_end + self.post_samples)
+                # next alert needs a window that does not overlap this one
+                self.rearm_at = hop_index + window_hops
+            elif hop_index % window_hops == 0:
+                if volume > self.threshold and not speech:
+                    print(f"...noise, not speech... ({volume:.6f})")
+                else:
+                    print(f"...quiet... ({volume:.6f})")
+
+            if self.vad is not None and hop_index % self.stats_hops == 0:
+                self.vad.report()
+
+        self.clips.flush()
+
+    def close(self):
+        self.clips.flush(force=True)
+        self.writer.close()
+        if self.rms.skipped:
+            print(f"⚠️ Analysis fell behind, skipped {self.rms.skipped} hops")
+        if self.writer.dropped:
+            print(f"⚠️ Dropped {self.writer.dropped} clips (disk too slow)")
+
+    def run(self, source, stop=stop_event):
+        """Analyses `source` until `stop` is set or a recorded source ends."""
+        if source.live:
+            with source.stream(self.hop_samples, self.feed):
+                if self.bus is not None:
+                    self.bus.publish("voice", "ready")
+                while not stop.is_set():
+                    if not self.wait(timeout=0.5):
+                        continue
+                    self.process()
+
+                    if source.status_flags:
+                        print(f"⚠️ Input stream: {', '.join(source.status_flags)}")
+                        source.status_flags.clear()
+        else:
+            # ✅ Recorded session: analyse as fast as it can be read
+            if self.bus is not None:
+                self.bus.publish("voice", "ready")
+            for block in source.blocks(self.hop_samples):
+                if stop.is_set():
+                    break
+                self.feed(block)
+                self.process()
+        self.close()
+
+
+def detect_sound_stream(threshold, source, window=WINDOW_SECONDS, hop=HOP_SECONDS,
+                        pre=PRE_TRIGGER_SECONDS, post=POST_TRIGGER_SECONDS, vad=True,
+                        stop=stop_event, bus=None):
+    monitor = VoiceMonitor(threshold, source.fmt, window, hop, pre, post, vad, bus)
+
+    print(f"\n🎤 Voice monitoring started! ({window:g}s windows every {hop:g}s, auto-stops when quiz ends)\n")
+    monitor.run(source, stop)
+    print("🛑 Voice monitoring stopping...")
+    return monitor
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Voice monitoring")
+    parser.add_argument("--mode", choices=["stream", "chunk"], default="stream",
+                        help="stream: overlapping windows from an input stream, chunk: blocking 1 s recordings")
+    parser.add_argument("--window", type=float, default=WINDOW_SECONDS, help="RMS window in seconds")
+    parser.add_argument("--hop", type=float, default=HOP_SECONDS, help="seconds between windows")
+    parser.add_argument("--pre", type=float, default=PRE_TRIGGER_SECONDS,
+                        help="seconds of audio before the loud window kept in evidence clips")
+    parser.add_argument("--post", type=float, default=POST_TRIGGER_SECONDS,
+                        help="seconds of audio after the trigger kept in evidence clips")
+    parser.add_argument("--rate", type=int, default=SAMPLE_RATE, help="capture sample rate in Hz")
+    parser.add_argument("--dtype", choices=["int16", "float32", "float64"], default=SAMPLE_DTYPE,
+                        help="capture sample type")
+    parser.add_argument("--codec", choices=sorted(CODECS), default=CLIP_CODEC,
+                        help="evidence clip encoding")
+    parser.add_argument("--no-vad", dest="vad", action="store_false",
+                        help="stream mode: fixed threshold from calibration, no speech check")
+    parser.add_argument("--source",
+                        help="audio file to read instead of the microphone (sets --rate to the file's)")
+    args = parser.parse_args(argv)
+    if not 0 < args.hop <= args.window:
+        parser.error("--hop must be > 0 and no longer than --window")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    signal.signal(signal.SIGTERM, handle_exit)
+    signal.signal(signal.SIGINT, handle_exit)
+
+    fmt = AudioFormat(args.rate, args.dtype, args.codec)
+
+    try:
+        source = open_audio_source(fmt, args.source)
+        bg = calibrate_background(source, 4)
+        threshold = bg * 1.5  # sensitivity
+        if args.mode == "stream":
+            detect_sound_stream(threshold, source, args.window, args.hop, args.pre, args.post, args.vad)
+        else:
+            detect_sound(threshold, source)
+
+    except Exception as e:
+        print("❌ Fatal Error:", e)
+
+    print("✅ Voice monitor closed cleanly")
+
 
-print("✅ Voice monitor closed cleanly")
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,90 @@
-import subprocess
+import asyncio
 import sys
 import os
-import signal
-import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "detection"))
+from launcher import MONITOR_PATH, READY_TIMEOUT, STOP_TIMEOUT
+from supervisor import ManagedProcess
 
 # ---------------------------
 #  GLOBAL PROCESS HANDLERS
 # ---------------------------
-face_proc = None
-voice_proc = None
+monitor_proc = None
 quiz_proc = None
 
 
+def on_monitor_exit(child, returncode, restarting):
+    if restarting:
+        print(f"⚠️ Monitoring crashed (exit {returncode}), restarting...")
+    elif returncode != 0 and not child.stopping:
+        print(f"❌ Monitoring exited with {returncode}")
+
+
 # ---------------------------
 #  START MONITORING
 # ---------------------------
-def start_monitoring():
-    global face_proc, voice_proc
+async def start_monitoring():
+    global monitor_proc
 
-    face_path = os.path.join("detection", "face.py")
-    voice_path = os.path.join("detection", "voice.py")
+    # ✅ Face + voice run as threads of one supervised process
+    # (restarted with backoff if it crashes, e.g. the camera stops delivering frames)
+    print("✅ Starting face + voice monitoring...")
+    monitor_proc = ManagedProcess("monitor", [MONITOR_PATH])
+    monitor_proc.on_exit.append(on_monitor_exit)
+    await monitor_proc.start()
 
-    print("✅ Starting face detection...")
-    face_proc = subprocess.Popen([sys.executable, face_path])
-
-    print("✅ Starting voice detection...")
-    voice_proc = subprocess.Popen([sys.executable, voice_path])
+    if await monitor_proc.wait_ready(READY_TIMEOUT):
+        print(f"✅ Monitoring ready in {monitor_proc.ready_in:.2f}s")
+    else:
+        print(f"⚠️ Monitoring not fully ready: {monitor_proc.failure or 'timed out'}")
 
 
 # ---------------------------
 #  STOP MONITORING
 # ---------------------------
-def stop_monitoring():
-    global face_proc, voice_proc
+async def stop_monitoring():
+    global monitor_proc
 
     print("\n🛑 Stopping monitoring...")
 
-    try:
-        if face_proc and face_proc.poll() is None:
-            face_proc.terminate()
-            print("✅ face.py stopped")
-    except:
-        pass
-
-    try:
-        if voice_proc and voice_proc.poll() is None:
-            voice_proc.terminate()
-            print("✅ voice.py stopped")
-    except:
-        pass
+    if monitor_proc is not None:
+        await monitor_proc.stop(STOP_TIMEOUT)
+        print("✅ Monitoring stopped")
+        monitor_proc = None
 
 
 # ---------------------------
 #  RUN QUIZ
 # ---------------------------
-def run_quiz():
+async def run_quiz():
     global quiz_proc
 
     quiz_path = os.path.join("tkinter", "quiz_file.py")
     print("🎯 Launching Quiz...")
 
-    quiz_proc = subprocess.Popen([sys.executable, quiz_path])
+    quiz_proc = ManagedProcess("quiz", [quiz_path], restart=False, protocol=False)
+    await quiz_proc.start()
 
-    # ✅ Wait until the quiz window is closed
-    while quiz_proc.poll() is None:
-        time.sleep(0.5)
+    # ✅ Wait until the quiz window is closed (exit notification, no polling)
+    await quiz_proc.wait_exit()
 
     print("✅ Quiz closed!")
 
 
+async def run_exam():
+    await start_monitoring()
+    try:
+        await run_quiz()
+    finally:
+        await stop_monitoring()
+
+
 # ---------------------------
 #  MAIN EXECUTION
 # ---------------------------
 if __name__ == "__main__":
     print("🚀 Starting Full Exam System...")
 
-    start_monitoring()
-    run_quiz()
-    stop_monitoring()
+    asyncio.run(run_exam())
 
     print("✅ System Finished. Goodbye!")
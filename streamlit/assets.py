@@ -0,0 +1,183 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import streamlit as st
+
+
+# ---------------------------------------------------------
+# STATIC ASSETS
+# ---------------------------------------------------------
+# Page CSS, images and fonts live in assets/. build() copies them into
+# static/ under content-hashed names (quiz.css -> quiz.3f2a9c01de.css)
+# plus a manifest.json; Streamlit serves that folder at app/static/
+# (enableStaticServing in .streamlit/config.toml). Pages emit a <link> /
+# <img> pointing at the hashed file, so a rerun sends a one-line tag
+# instead of the stylesheet, nothing is fetched from the internet, and
+# a changed file gets a new URL. Run through serve.py, hashed files are
+# also sent with a one-year immutable Cache-Control.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(BASE_DIR, "assets")
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+MANIFEST_PATH = os.path.join(STATIC_DIR, "manifest.json")
+URL_PREFIX = "app/static/"
+LONG_CACHE = b"public, max-age=31536000, immutable"
+CHECK_INTERVAL = 5.0   # seconds between checks of assets/ for edited files
+
+CSS_URL = re.compile(r"""url\((['"]?)(?!data:|https?:|/)([^'")]+)\1\)""")
+HASHED_NAME = re.compile(r"\.[0-9a-f]{10}\.\w+$")
+
+
+def hashed_name(name, data):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+
+
+def _sources():
+    sources = []
+    for root, _, files in os.walk(ASSETS_DIR):
+        for file in files:
+            path = os.path.join(root, file)
+            sources.append((os.path.relpath(path, ASSETS_DIR).replace(os.sep, "/"), path))
+    # ✅ CSS last: its url(...) references are rewritten to the hashed names
+    return sorted(sources, key=lambda s: (s[0].endswith(".css"), s[0]))
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build():
+    """Writes every asset to static/ under its hashed name, removes stale
+    hashed files and returns the manifest {name: hashed name}."""
+    manifest = {}
+    for name, path in _sources():
+        with open(path, "rb") as f:
+            data = f.read()
+        if name.endswith(".css"):
+            folder = os.path.dirname(name)
+
+            def rewrite(m):
+                ref = os.path.normpath(os.path.join(folder, m.group(2))).replace(os.sep, "/")
+                if ref not in manifest:
+                    return m.group(0)
+                return f"url({m.group(1)}{os.path.relpath(manifest[ref], folder or '.')}{m.group(1)})"
+
+            data = CSS_URL.sub(rewrite, data.decode("utf-8")).encode("utf-8")
+        manifest[name] = hashed_name(name, data)
+        target = os.path.join(STATIC_DIR, manifest[name])
+        if not os.path.exists(target):
+            _write(target, data)
+
+    current = {os.path.normpath(os.path.join(STATIC_DIR, h)) for h in manifest.values()}
+    for root, _, files in os.walk(STATIC_DIR):
+        for file in files:
+            path = os.path.normpath(os.path.join(root, file))
+            if HASHED_NAME.search(file) and path not in current:
+                os.remove(path)
+
+    _write(MANIFEST_PATH, json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+# ---------------------------------------------------------
+# PROCESS-WIDE MANIFEST
+# ---------------------------------------------------------
+# Loaded once; assets/ is checked for edited files at most every
+# CHECK_INTERVAL seconds (not on every URL lookup) and the bundle is
+# rebuilt only when a file there is newer than the manifest.
+
+_manifest = None
+_manifest_mtime = None
+_manifest_checked = None    # monotonic time of the last freshness check
+_manifest_lock = threading.Lock()
+
+
+def _newest_source():
+    return max((os.stat(path).st_mtime_ns for _, path in _sources()), default=0)
+
+
+def manifest():
+    global _manifest, _manifest_mtime, _manifest_checked
+    now = time.monotonic()
+    if _manifest is not None and now - _manifest_checked < CHECK_INTERVAL:
+        return _manifest
+
+    with _manifest_lock:
+        if _manifest is not None and now - _manifest_checked < CHECK_INTERVAL:
+            return _manifest
+        newest = _newest_source()
+        _manifest_checked = now
+        if _manifest is not None and _manifest_mtime >= newest:
+            return _manifest
+
+        try:
+            built = os.stat(MANIFEST_PATH).st_mtime_ns
+        except FileNotFoundError:
+            built = -1
+        if built >= newest:
+            with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+                _manifest = json.load(f)
+        else:
+            _manifest = build()
+            built = os.stat(MANIFEST_PATH).st_mtime_ns
+        _manifest_mtime = built
+        return _manifest
+
+
+def asset_url(name):
+    """URL of an asset in assets/ (e.g. "img/python.svg") as served to the browser."""
+    return URL_PREFIX + manifest()[name]
+
+
+def use_css(name):
+    # ✅ One <link> per run; the stylesheet itself is fetched once and cached
+    st.markdown(f'<link rel="stylesheet" href="{asset_url(name)}">', unsafe_allow_html=True)
+
+
+# ---------------------------------------------------------
+# LONG-LIVED CACHE HEADERS (ASGI middleware, see serve.py)
+# ---------------------------------------------------------
+
+class LongCacheMiddleware:
+    """Marks hashed files under /app/static/ as cacheable for a year:
+    their name changes whenever their content does."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or "/app/static/" not in path or not HASHED_NAME.search(path):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_cached(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"cache-control"]
+                message = {**message, "headers": headers + [(b"cache-control", LONG_CACHE)]}
+            await send(message)
+
+        await self.app(scope, receive, send_cached)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the hashed static asset bundle")
+    parser.parse_args(argv)
+
+    for name, hashed in build().items():
+        size = os.path.getsize(os.path.join(STATIC_DIR, hashed))
+        print(f"✅ {name} -> static/{hashed} ({size / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import statistics
+import threading
+import time
+
+from passwords import (PasswordHasher, HasherBusy, hash_password,
+                       SCRYPT_N, SCRYPT_R, SCRYPT_P, WORKERS, MAX_PENDING)
+
+
+# ---------------------------------------------------------
+# LOGIN THROUGHPUT BENCHMARK
+# ---------------------------------------------------------
+# Simulates the exam-morning rush: `concurrency` candidates press Sign In
+# at the same time, over and over, against one PasswordHasher (the same
+# bounded pool login.py uses). For every scrypt cost setting reports
+# logins/sec, p50/p99 latency as seen by the candidate, and how many
+# attempts were turned away with HasherBusy.
+#
+#   python bench_login.py --costs 12 14 15 --concurrency 1 8 64 --workers 4
+
+PASSWORD = "correct horse battery staple"
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Login throughput at several scrypt costs")
+    parser.add_argument("--costs", type=int, nargs="+", default=[12, 13, 14, 15],
+                        help="log2 of scrypt n (default: 12 13 14 15)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64],
+                        help="simultaneous logins")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="hashing threads")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING)
+    parser.add_argument("--seconds", type=float, default=3.0, help="per measurement")
+    return parser
+
+
+def measure(hasher, stored, concurrency, seconds):
+    """(logins/sec, latencies in s, busy count) for one setting."""
+    latencies, busy = [], [0]
+    lock = threading.Lock()
+    start_gate = threading.Barrier(concurrency + 1)
+    deadline = [0.0]
+
+    def candidate():
+        start_gate.wait()
+        while time.perf_counter() < deadline[0]:
+            start = time.perf_counter()
+            try:
+                ok, _ = hasher.verify(PASSWORD, stored)
+                assert ok
+            except HasherBusy:
+                with lock:
+                    busy[0] += 1
+                time.sleep(0.01)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=candidate) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    began = time.perf_counter()
+    deadline[0] = began + seconds
+    start_gate.wait()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - began
+    return len(latencies) / elapsed, latencies, busy[0]
+
+
+def percentile(values, q):
+    if len(values) < 2:
+        return values[0] if values else float("nan")
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    print(f"scrypt r={SCRYPT_R} p={SCRYPT_P}, {args.workers} workers, "
+          f"max {args.max_pending} pending, {args.seconds:g} s per row")
+    print(f"{'n':>8}{'MiB':>6}{'clients':>9}{'logins/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'busy':>7}")
+    for cost in args.costs:
+        n = 2 ** cost
+        stored = hash_password(PASSWORD, n, SCRYPT_R, SCRYPT_P)
+        hasher = PasswordHasher(n, SCRYPT_R, SCRYPT_P, workers=args.workers, max_pending=args.max_pending)
+        try:
+            for concurrency in args.concurrency:
+                rate, latencies, busy = measure(hasher, stored, concurrency, args.seconds)
+                default = "*" if n == SCRYPT_N else " "
+                print(f"{'2^' + str(cost) + default:>8}{128 * n * SCRYPT_R / 2 ** 20:6.0f}{concurrency:9d}"
+                      f"{rate:10.1f}{percentile(latencies, 50) * 1000:9.1f}"
+                      f"{percentile(latencies, 99) * 1000:9.1f}{busy:7d}")
+        finally:
+            hasher.close()
+    print("* = default cost")
+
+
+if __name__ == "__main__":
+    main()
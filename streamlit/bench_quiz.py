@@ -0,0 +1,191 @@
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import streamlit as st
+from streamlit import runtime
+
+
+# ---------------------------------------------------------
+# QUIZ CLICK BENCHMARK
+# ---------------------------------------------------------
+# Starts a real Streamlit server on this file (which seeds a logged-in
+# session and shows the running quiz), then plays a browser over the
+# websocket: pick an answer + Next for every question, then Previous
+# back to the first. Reports the server's CPU time (/proc, Linux) and
+# bytes sent per interaction.
+#
+#   python bench_quiz.py --subject Python --level basic
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Server CPU per quiz interaction")
+    parser.add_argument("--subject", default="Python")
+    parser.add_argument("--level", default="basic")
+    parser.add_argument("--rounds", type=int, default=3, help="passes through the quiz")
+    parser.add_argument("--port", type=int, default=0, help="server port (default: a free one)")
+    return parser
+
+
+# ---------- server side (under `streamlit run`) ----------
+def serve(args):
+    from quiz import show_quiz_app
+
+    st.session_state.setdefault("logged_in", True)
+    st.session_state.setdefault("username", "bench")
+    st.session_state.setdefault("selected_subject", args.subject)
+    st.session_state.setdefault("selected_level", args.level)
+    show_quiz_app()
+
+
+# ---------- client side ----------
+def server_cpu(pid):
+    """utime + stime of `pid` in seconds."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLK_TCK
+
+
+class Page:
+    """The widgets of the last run, as the browser would track them."""
+
+    def __init__(self):
+        self.radio = None      # (id, option labels, fragment id)
+        self.buttons = {}      # label -> (id, fragment id)
+        self.values = {}       # radio id -> chosen label (radios keep theirs)
+
+
+async def rerun(ws, page, widget_id=None, value=None, trigger=False):
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    msg = BackMsg()
+    state = msg.rerun_script
+    state.SetInParent()
+    for wid, val in page.values.items():
+        state.widget_states.widgets.add(id=wid, string_value=val)
+    if widget_id is not None:
+        if trigger:
+            state.widget_states.widgets.add(id=widget_id, trigger_value=True)
+        else:
+            page.values[widget_id] = value
+            state.widget_states.widgets.add(id=widget_id, string_value=value)
+        fragment = page.radio[2] if page.radio and page.radio[0] == widget_id else \
+            next((f for wid, f in page.buttons.values() if wid == widget_id), "")
+        if fragment:
+            state.fragment_id = fragment
+            # a fragment run re-sends only that fragment's elements
+            page.buttons = {k: v for k, v in page.buttons.items() if v[1] != fragment}
+    await ws.send(msg.SerializeToString())
+
+    received = 0
+    while True:
+        raw = await ws.recv()
+        received += len(raw)
+        fwd = ForwardMsg()
+        fwd.ParseFromString(raw)
+        kind = fwd.WhichOneof("type")
+        if kind == "new_session":  # a full run re-sends the whole page
+            page.buttons.clear()
+        elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+            element = fwd.delta.new_element
+            etype = element.WhichOneof("type")
+            if etype == "radio":
+                page.radio = (element.radio.id, list(element.radio.options), fwd.delta.fragment_id)
+            elif etype == "button":
+                page.buttons[element.button.label] = (element.button.id, fwd.delta.fragment_id)
+        elif kind == "script_finished" and fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+            return received  # an st.rerun() inside the run is part of the same click
+
+
+def find_button(page, text):
+    return next((wid for label, (wid, _) in page.buttons.items() if text in label), None)
+
+
+async def play(url, pid, rounds):
+    import websockets
+
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        page = Page()
+        await rerun(ws, page)  # first page load (bank load, CSS) is not counted
+
+        results = {"answer": [], "navigation": []}  # (cpu s, wall s, bytes) per click
+
+        async def click(widget_id, value=None, trigger=False):
+            start_cpu, start = server_cpu(pid), time.perf_counter()
+            received = await rerun(ws, page, widget_id, value, trigger)
+            results["navigation" if trigger else "answer"].append(
+                (server_cpu(pid) - start_cpu, time.perf_counter() - start, received))
+
+        for _ in range(rounds):
+            steps = 0
+            while True:
+                await click(page.radio[0], value=page.radio[1][0])
+                nxt = find_button(page, "Next")
+                if nxt is None:
+                    break
+                await click(nxt, trigger=True)
+                steps += 1
+            for _ in range(steps):
+                await click(find_button(page, "Previous"), trigger=True)
+
+    return results
+
+
+def wait_healthy(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Streamlit server on port {port} did not come up")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    port = args.port or free_port()
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", os.path.abspath(__file__),
+         "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none", "--",
+         "--subject", args.subject, "--level", args.level],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_healthy(port)
+        results = asyncio.run(play(f"ws://127.0.0.1:{port}/_stcore/stream", server.pid, args.rounds))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{args.subject} / {args.level}, {args.rounds} rounds")
+    print(f"{'':12}{'clicks':>8}{'CPU ms':>10}{'p50 ms':>10}{'KB sent':>10}")
+    for kind, rows in results.items():
+        cpu, wall, sent = zip(*rows)
+        print(f"{kind:12}{len(rows):8d}{sum(cpu) / len(rows) * 1000:10.2f}"
+              f"{statistics.median(wall) * 1000:10.2f}{sum(sent) / len(rows) / 1024:10.2f}")
+
+
+if __name__ == "__main__":
+    if runtime.exists():
+        serve(build_parser().parse_args())
+    else:
+        main()
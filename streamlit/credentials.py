@@ -0,0 +1,122 @@
+import sqlite3
+import threading
+
+from passwords import shared_hasher
+from storage import shared_storage
+
+
+# ---------------------------------------------------------
+# CREDENTIAL STORE (login.py)
+# ---------------------------------------------------------
+# Accounts are looked up by username in the users table (primary key)
+# and kept in memory afterwards, so a login page rerun or a repeated
+# sign-in does not touch the database. The cache is dropped when the
+# table changes, whoever changed it (this process, admin.py, another
+# server): every write bumps meta.users_version (a trigger), and a
+# connection's PRAGMA data_version tells us, without reading anything,
+# whether any commit happened since the last check. Writes made through
+# this store update their own entry instead of dropping the cache.
+#
+# Passwords are checked on the bounded scrypt pool (passwords.py); an
+# account still on a legacy hash is re-hashed on its first good login.
+
+CACHE_SIZE = 50_000    # accounts kept in memory (oldest dropped first)
+DEFAULT_ADMIN = ("admin", "admin123")
+
+
+class CredentialStore:
+
+    def __init__(self, storage, hasher):
+        self.storage = storage
+        self.hasher = hasher
+        self.cache = {}            # username -> {"username", "password", "role"}, None = no such user
+        self.lock = threading.Lock()
+        self.users_version = None
+        self.data_version = None
+        self.watch = sqlite3.connect(storage.path, check_same_thread=False)
+
+    def _check(self):
+        """Empties the cache if the users table changed since the last call."""
+        data_version = self.watch.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self.data_version:
+            return
+        self.data_version = data_version
+        # ✅ Something was committed; only user changes matter (not quiz attempts)
+        users_version = self.storage.users_version()
+        if users_version != self.users_version:
+            self.cache.clear()
+            self.users_version = users_version
+
+    def _remember(self, username, user):
+        if len(self.cache) >= CACHE_SIZE:
+            del self.cache[next(iter(self.cache))]
+        self.cache[username] = user
+
+    def get(self, username):
+        """The account as {"username", "password", "role"}, or None."""
+        with self.lock:
+            self._check()
+            if username in self.cache:
+                return self.cache[username]
+        user = self.storage.get_user(username)
+        with self.lock:
+            self._remember(username, user)
+        return user
+
+    def _wrote(self, username, user):
+        """After our own write: keep the cache if that was the only change."""
+        users_version = self.storage.users_version()
+        with self.lock:
+            if self.users_version is not None and users_version == self.users_version + 1:
+                self.users_version = users_version
+                self._remember(username, user)
+            else:
+                self.cache.clear()
+                self.users_version = users_version
+
+    def authenticate(self, username, password):
+        """The account if `password` is right, else None. May raise
+        passwords.HasherBusy when the hashing pool is saturated."""
+        user = self.get(username)
+        if user is None:
+            return None
+        ok, new_hash = self.hasher.verify(password, user["password"])
+        if not ok:
+            return None
+        if new_hash is not None:
+            # ✅ Legacy SHA-256 / plaintext / older cost -> current scrypt
+            if self.storage.set_password(username, new_hash, old=user["password"]):
+                user = {**user, "password": new_hash}
+                self._wrote(username, user)
+        return user
+
+    def add(self, username, password, role="user"):
+        """Inserts one account (hashes `password`). False when the
+        username is taken."""
+        user = {"username": username, "password": self.hasher.hash(password), "role": role}
+        if not self.storage.add_user(username, user["password"], role):
+            return False
+        self._wrote(username, user)
+        return True
+
+
+# ---------------------------------------------------------
+# PROCESS-WIDE STORE
+# ---------------------------------------------------------
+
+_credentials = None
+_credentials_lock = threading.Lock()
+
+
+def shared_credentials():
+    """The server's CredentialStore. The first call also creates the
+    default admin account if there is none."""
+    global _credentials
+    with _credentials_lock:
+        if _credentials is None:
+            store = CredentialStore(shared_storage(), shared_hasher())
+            name, password = DEFAULT_ADMIN
+            if store.get(name) is None:
+                store.add(name, password, role="admin")
+            _credentials = store
+        return _credentials
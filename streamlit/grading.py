@@ -0,0 +1,103 @@
+import argparse
+
+import numpy as np
+
+from question_bank import load_bank, BankError
+from storage import Storage, DB_PATH
+
+
+UNANSWERED = -1
+
+
+# ---------------------------------------------------------
+# GRADING (answer key built once per bank, see question_bank.py)
+# ---------------------------------------------------------
+
+def chosen_array(answers, count):
+    """{question position: option index} -> int array, UNANSWERED where blank."""
+    chosen = np.full(count, UNANSWERED, dtype=np.int16)
+    for position, option in answers.items():
+        if option is not None:
+            chosen[int(position)] = option
+    return chosen
+
+
+def grade(bank, order, chosen):
+    """Points scored by one attempt: `order` are the bank indices of the
+    questions asked, `chosen` the option picked for each."""
+    order = np.asarray(order, dtype=np.intp)
+    hits = np.asarray(chosen) == bank.correct[order]
+    return int(bank.points[order] @ hits)
+
+
+def grade_many(bank, orders, chosen):
+    """Scores for many attempts at once. `orders` and `chosen` are
+    (attempts x questions) arrays; shorter attempts are padded with -1
+    in `orders`."""
+    orders = np.asarray(orders, dtype=np.intp)
+    asked = orders >= 0
+    index = np.where(asked, orders, 0)
+    hits = (np.asarray(chosen) == bank.correct[index]) & asked
+    return (bank.points[index] * hits).sum(axis=1)
+
+
+def stack(records, key):
+    """Pads each record's `key` list to a common width with -1."""
+    width = max(len(r[key]) for r in records)
+    out = np.full((len(records), width), -1, dtype=np.int64)
+    for row, record in enumerate(records):
+        out[row, :len(record[key])] = record[key]
+    return out
+
+
+# ---------------------------------------------------------
+# BULK RE-GRADE OF STORED ATTEMPTS
+# ---------------------------------------------------------
+
+def regrade_attempts(records):
+    """Re-grades stored attempts (storage.Storage.gradable_attempts())
+    against the current banks, one vectorised pass per bank. Updates the
+    records' "score" in place; returns (regraded, changed)."""
+    by_bank = {}
+    for record in records:
+        if record.get("questions") and record.get("answers") is not None:
+            by_bank.setdefault((record.get("subject"), (record.get("level") or "").lower()), []).append(record)
+
+    regraded = changed = 0
+    for (subject, level), records in by_bank.items():
+        try:
+            bank = load_bank(subject, level)
+        except BankError as e:
+            print(f"⚠️ Skipping {len(records)} attempts: {e}")
+            continue
+        orders = stack(records, "questions")
+        if orders.max() >= len(bank.questions):
+            print(f"⚠️ Skipping {subject} {level}: bank has fewer questions than the stored attempts")
+            continue
+        scores = grade_many(bank, orders, stack(records, "answers"))
+        for record, score in zip(records, scores.tolist()):
+            changed += record.get("score") != score
+            record["score"] = score
+        regraded += len(records)
+    return regraded, changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-grade stored quiz attempts against the current question banks")
+    parser.add_argument("--db", default=DB_PATH, help="attempt store (see storage.py)")
+    parser.add_argument("--dry-run", action="store_true", help="report only, don't write")
+    args = parser.parse_args(argv)
+
+    storage = Storage(args.db)
+    records = storage.gradable_attempts()
+    before = {r["id"]: r["score"] for r in records}
+
+    regraded, changed = regrade_attempts(records)
+    print(f"✅ Re-graded {regraded} attempts, {changed} scores changed")
+
+    if changed and not args.dry_run:
+        storage.update_scores([(r["id"], r["score"]) for r in records if r["score"] != before[r["id"]]])
+
+
+if __name__ == "__main__":
+    main()
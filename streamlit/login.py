@@ -1,142 +1,54 @@
 import streamlit as st
-import json, os, hashlib, re
+import math, re
 
-# ---------- Utility ----------
-def load_users():
-    if not os.path.exists("users.json"):
-        json.dump({}, open("users.json", "w"))
-    return json.load(open("users.json"))
-
-def save_users(users):
-    json.dump(users, open("users.json", "w"), indent=4)
-
-def hash_password(p): 
-    return hashlib.sha256(p.encode()).hexdigest()
+from assets import use_css, asset_url
+from credentials import shared_credentials
+from passwords import HasherBusy
+from ratelimit import shared_limiter
 
-def verify_user(u, p, users): 
-    return u in users and users[u]["password"] == hash_password(p)
+# ---------- Utility ----------
+def client_id():
+    # address of the browser; None for localhost or when it cannot be told (some proxies)
+    return st.context.ip_address
+
+def verify_user(u, p, credentials):
+    """(account or None, message to show instead of the default one)."""
+    # ✅ Rate limits first: a blocked attempt costs no lookup and no hash
+    limiter = shared_limiter()
+    wait = limiter.check(u, client_id())
+    if wait:
+        return None, f"Too many login attempts. Please try again in {math.ceil(wait)} seconds."
+
+    # ✅ Cached keyed lookup + scrypt check on the bounded pool
+    try:
+        user = credentials.authenticate(u, p)
+    except HasherBusy:
+        return None, "Too many sign-ins right now, please try again in a few seconds."
+
+    if user is None:
+        limiter.failed(u)
+    else:
+        limiter.succeeded(u)
+    return user, None
+
+def create_user(u, p, credentials):
+    """(created, message to show instead of the default one)."""
+    # ✅ Single-row insert; the primary key rejects a taken name atomically
+    try:
+        return credentials.add(u, p), None
+    except HasherBusy:
+        return False, "Too many sign-ups right now, please try again in a few seconds."
 
 
 # ---------- App ----------
 def show_login_system():
     st.set_page_config(page_title="PrepSecure", layout="wide")
 
-    # ---------- Custom Style ----------
-    st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;600&display=swap');
-    html, body, [class*="css"] {
-        font-family: 'Poppins', sans-serif;
-        background-color: #0f0f1a;
-        color: white;
-    }
-
-    .left-img {
-        border-radius: 15px;
-        overflow: hidden;
-        box-shadow: 0 0 25px rgba(0,0,0,0.5);
-    }
-
-    .left-img img {
-        width: 100%;
-        height: 85vh;
-        object-fit: cover;
-        border-radius: 15px;
-    }
-
-    .overlay-text {
-        position: relative;
-        bottom: 90px;
-        left: 30px;
-        font-size: 1.5rem;
-        font-weight: 600;
-        color: white;
-        text-shadow: 0 3px 10px rgba(0,0,0,0.8);
-    }
-
-    /* 🔹 Added spacing between image and form */
-    .right-section {
-        margin-left: 3rem;
-    }
-
-    .stTabs [data-baseweb="tab-list"] {
-        justify-content: left;
-        border-bottom: 1px solid #444;
-    }
-
-    .stTabs [data-baseweb="tab"] {
-        font-weight: 600;
-        color: #bbb;
-    }
-
-    .stTabs [data-baseweb="tab"]:hover {
-        color: #fff;
-    }
-
-    .stTabs [aria-selected="true"] {
-        color: white !important;
-    }
-
-    .stTextInput>div>div>input, .stPasswordInput>div>div>input {
-        background-color: #1f1f2e;
-        color: white;
-        border-radius: 8px;
-        border: none;
-    }
-
-    .stButton>button {
-        width: 100%;
-        background: linear-gradient(90deg, #8b5cf6, #6366f1);
-        color: white;
-        border: none;
-        padding: 0.6rem;
-        border-radius: 10px;
-        font-weight: 600;
-        font-size: 1rem;
-        transition: 0.3s;
-    }
-
-    .stButton>button:hover {
-        transform: scale(1.03);
-        box-shadow: 0 0 20px rgba(139, 92, 246, 0.5);
-    }
-
-    /* ---------- Soft Fade-In Animation ---------- */
-    @keyframes fadeIn {
-        0% {
-            opacity: 0;
-            transform: translateY(20px);
-        }
-        100% {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-
-    .container, .card, .right-side, .left-side {
-        opacity: 0;
-        animation: fadeIn 1s ease-out forwards;
-    }
-
-    /* Add subtle delays for a staggered entrance */
-    .card {
-        animation-delay: 0.2s;
-    }
-    .left-side {
-        animation-delay: 0.4s;
-    }
-    .right-side {
-        animation-delay: 0.6s;
-    }
-
-    </style>
-    """, unsafe_allow_html=True)
-
-    # ---------- Users ----------
-    users = load_users()
-    if "admin" not in users:
-        users["admin"] = {"password": hash_password("admin123"), "role": "admin"}
-        save_users(users)
+    # ---------- Custom Style (assets/login.css, served from static/) ----------
+    use_css("login.css")
+
+    # ---------- Users (cached credential store; default admin created once per process) ----------
+    credentials = shared_credentials()
 
     if "logged_in" not in st.session_state:
         st.session_state.logged_in = False
@@ -146,9 +58,9 @@ def show_login_system():
 
     with left:
         st.markdown(
-            """
+            f"""
             <div class="left-img left-side">
-                <img src="https://images.unsplash.com/photo-1519389950473-47ba0277781c" alt="background">
+                <img src="{asset_url('img/login-bg.svg')}" alt="background">
                 <div class="overlay-text">
                     Capturing Moments,<br>Creating Memories
                 </div>
@@ -174,8 +86,9 @@ def show_login_system():
                 u = st.text_input("Username")
                 p = st.text_input("Password", type="password")
                 if st.button("Sign In"):
-                    if verify_user(u, p, users):
-                        if users[u]["role"] == "admin":
+                    user, message = verify_user(u, p, credentials)
+                    if user:
+                        if user["role"] == "admin":
                             st.warning("Use Admin tab for admin access.")
                         else:
                             st.session_state.logged_in = True
@@ -184,7 +97,7 @@ def show_login_system():
                             st.success(f"Welcome back, {u}!")
                             st.rerun()
                     else:
-                        st.error("Invalid username or password.")
+                        st.error(message or "Invalid username or password.")
 
             # -------------------- SIGN UP --------------------
             with tab2:
@@ -195,18 +108,18 @@ def show_login_system():
 
                 if st.button("Sign Up"):
                     valid_username = re.fullmatch(r"[A-Za-z0-9_]+", nu)
-                    if nu in users:
-                        st.warning("Username already exists!")
-                    elif np != cp:
+                    if np != cp:
                         st.warning("Passwords do not match.")
                     elif not valid_username:
                         st.warning("Username can only contain letters, numbers, and underscores.")
                     elif len(nu) < 3 or len(np) < 3:
                         st.warning("Username and password must be at least 3 characters.")
                     else:
-                        users[nu] = {"password": hash_password(np), "role": "user"}
-                        save_users(users)
-                        st.success("Account created successfully! You can now login.")
+                        created, message = create_user(nu, np, credentials)
+                        if not created:
+                            st.warning(message or "Username already exists!")
+                        else:
+                            st.success("Account created successfully! You can now login.")
 
             # -------------------- ADMIN LOGIN --------------------
             with tab3:
@@ -215,14 +128,15 @@ def show_login_system():
                 ap = st.text_input("Admin Password", type="password")
 
                 if st.button("Admin Login"):
-                    if verify_user(au, ap, users) and users[au]["role"] == "admin":
+                    admin, message = verify_user(au, ap, credentials)
+                    if admin and admin["role"] == "admin":
                         st.session_state.logged_in = True
                         st.session_state.username = au
                         st.session_state.role = "admin"
                         st.success(f"Welcome Admin, {au}!")
                         st.rerun()
                     else:
-                        st.error("Invalid admin credentials.")
+                        st.error(message or "Invalid admin credentials.")
         else:
             # Logged in view
             st.header(f"Welcome, {st.session_state.username}")
@@ -0,0 +1,145 @@
+import argparse
+import base64
+import hashlib
+import hmac
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ---------------------------------------------------------
+# PASSWORD HASHING (scrypt)
+# ---------------------------------------------------------
+# Stored as "scrypt$<n>$<r>$<p>$<salt>$<hash>" (base64): a random salt
+# per password and a memory-hard KDF, so a leaked users table cannot be
+# reversed with a lookup table or cheaply on a GPU.
+#
+# Older accounts are still accepted and upgraded on their next login:
+#   - 64 hex digits: unsalted SHA-256 (login.py before this module)
+#   - anything else: plaintext (tkinter/users.json)
+#
+# One scrypt call takes 128 * n * r bytes of memory and (at the default
+# n=2**14, r=8) ~50 ms of CPU. Verification runs on a fixed pool of
+# WORKERS threads (hashlib releases the GIL), so the server never runs
+# more than WORKERS of them at once: during a login rush memory stays
+# bounded and the rest of the app keeps its CPU. When more than
+# MAX_PENDING logins are already waiting, new ones fail fast with
+# HasherBusy instead of queueing for ever.
+
+SCRYPT_N = 2 ** 14     # CPU/memory cost (power of two)
+SCRYPT_R = 8           # block size
+SCRYPT_P = 1           # parallelism
+SALT_BYTES = 16
+HASH_BYTES = 32
+WORKERS = min(4, os.cpu_count() or 1)
+MAX_PENDING = 64       # logins waiting for a worker before HasherBusy
+
+PREFIX = "scrypt"
+LEGACY_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+class HasherBusy(Exception):
+    """Too many password checks already queued; try again shortly."""
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r * p, dklen=HASH_BYTES)
+
+
+def hash_password(password, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    """A new salted scrypt hash of `password` (the stored form)."""
+    salt = os.urandom(SALT_BYTES)
+    return f"{PREFIX}${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+
+def verify_password(password, stored, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    """(matches, new stored hash or None). The new hash is returned when
+    the password matched a legacy format or older cost parameters."""
+    if not stored:
+        return False, None    # no password set: nothing matches it
+    if stored.startswith(PREFIX + "$"):
+        try:
+            _, sn, sr, sp, salt, digest = stored.split("$")
+            sn, sr, sp = int(sn), int(sr), int(sp)
+            ok = hmac.compare_digest(_scrypt(password, _unb64(salt), sn, sr, sp), _unb64(digest))
+        except ValueError:
+            return False, None
+        outdated = (sn, sr, sp) != (n, r, p)
+    elif LEGACY_SHA256.fullmatch(stored):
+        ok = hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+        outdated = True
+    else:
+        ok = hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+        outdated = True
+
+    if ok and outdated:
+        return True, hash_password(password, n, r, p)
+    return ok, None
+
+
+# ---------------------------------------------------------
+# BOUNDED HASHING POOL
+# ---------------------------------------------------------
+
+class PasswordHasher:
+    """hash_password / verify_password on a fixed pool of worker threads."""
+
+    def __init__(self, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, workers=WORKERS, max_pending=MAX_PENDING):
+        self.cost = (n, r, p)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self.slots = threading.BoundedSemaphore(workers + max_pending)
+
+    def _run(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            raise HasherBusy("too many logins in progress")
+        try:
+            return self.pool.submit(fn, *args, *self.cost).result()
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        return self._run(hash_password, password)
+
+    def verify(self, password, stored):
+        """Same as verify_password(); blocks the caller, not the pool."""
+        return self._run(verify_password, password, stored)
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def shared_hasher():
+    """The server's PasswordHasher (one pool per process)."""
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher()
+        return _hasher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hash a password the way the quiz stores it")
+    parser.add_argument("password")
+    parser.add_argument("--n", type=int, default=SCRYPT_N)
+    parser.add_argument("--r", type=int, default=SCRYPT_R)
+    parser.add_argument("--p", type=int, default=SCRYPT_P)
+    args = parser.parse_args(argv)
+    print(hash_password(args.password, args.n, args.r, args.p))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import argparse
+import glob
+import json
+import mmap
+import os
+import random
+import struct
+from collections.abc import Sequence
+
+import numpy as np
+
+
+# ---------------------------------------------------------
+# COMPILED QUESTION BANK (.qbank)
+# ---------------------------------------------------------
+# One file per bank, next to its source (questions/c_b.json -> c_b.qbank,
+# quizzes/quiz1.txt -> quiz1.qbank):
+#
+#   header      HEADER below (section offsets, 8-byte aligned)
+#   meta        UTF-8 JSON: id, title, description, level, is_active
+#   correct     int16[count]   correct option index per question
+#   points      int32[count]
+#   n_options   uint8[count]
+#   first       uint32[count]  string index of the question text; its
+#                              options are the next n_options strings
+#   offsets     uint64[strings + 1] into the string table
+#   strings     UTF-8, concatenated
+#
+# The loader memory-maps the file: the answer key is used in place and a
+# question is decoded only when it is asked, so opening a bank and sampling
+# 20 questions costs the same for 60 questions or 60,000.
+
+MAGIC = b"QBNK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIII7Q")  # magic, version, reserved, count, strings, meta_len, 7 offsets
+EXT = ".qbank"
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BASE_DIR)
+SOURCES = [
+    os.path.join(BASE_DIR, "questions", "*.json"),
+    os.path.join(PROJECT_ROOT, "tkinter", "quizzes", "*.txt"),
+]
+
+
+def compiled_path(source):
+    return os.path.splitext(source)[0] + EXT
+
+
+def fresh_compiled(source):
+    """The compiled file for `source` if it exists and is not older."""
+    path = compiled_path(source)
+    try:
+        if os.stat(path).st_mtime_ns >= os.stat(source).st_mtime_ns:
+            return path
+    except FileNotFoundError:
+        pass
+    return None
+
+
+# ---------- sources ----------
+def parse_txt(path):
+    """tkinter/quizzes/*.txt blocks: "Q: ...", "A) ..".."D) ..", "Answer: B"
+    (same rules as tkinter/quiz_file.py: first four options, 1 point each)."""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read().strip()
+
+    questions = []
+    for block in content.split("\n\n"):
+        lines = [ln.strip() for ln in block.split("\n") if ln.strip()]
+        if len(lines) < 3:
+            continue
+        options, answer = [], ""
+        for line in lines[1:]:
+            if line.startswith(("A)", "B)", "C)", "D)")):
+                options.append(line[3:].strip())
+            elif line.startswith("Answer:"):
+                idx = ord((line.split(":", 1)[1].strip().upper() or "?")[0]) - ord("A")
+                if 0 <= idx < len(options):
+                    answer = options[idx]
+        question = lines[0][2:].strip() if lines[0].startswith("Q:") else lines[0]
+        if question and options and answer:
+            questions.append({"question": question, "options": options[:4], "answer": answer, "points": 1})
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    return {"id": name, "title": name, "questions": questions}
+
+
+def read_source(path):
+    if path.endswith(".txt"):
+        return parse_txt(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ---------- compiler ----------
+def _align(n):
+    return (n + 7) & ~7
+
+
+def compile_bank(source, out=None):
+    """Validates `source` (.json bank or .txt quiz) and writes its .qbank.
+    Returns (out path, question count)."""
+    from question_bank import parse_question, BankError
+
+    data = read_source(source)
+    try:
+        questions = [parse_question(q, n) for n, q in enumerate(data.get("questions", []), 1)]
+    except BankError as e:
+        raise BankError(f"{source}: {e}") from None
+
+    meta = json.dumps({
+        "id": data.get("id", "N/A"),
+        "title": data.get("title", "Untitled Quiz"),
+        "description": data.get("description", ""),
+        "level": data.get("level", ""),
+        "is_active": data.get("is_active", True),
+    }, ensure_ascii=False).encode("utf-8")
+
+    strings, first = [], []
+    for q in questions:
+        first.append(len(strings))
+        strings.append(q.question.encode("utf-8"))
+        strings.extend(o.encode("utf-8") for o in q.options)
+    offsets = np.zeros(len(strings) + 1, dtype="<u8")
+    np.cumsum([len(s) for s in strings], out=offsets[1:])
+
+    count = len(questions)
+    sections = [
+        meta,
+        np.array([q.correct for q in questions], dtype="<i2").tobytes(),
+        np.array([q.points for q in questions], dtype="<i4").tobytes(),
+        np.array([len(q.options) for q in questions], dtype="u1").tobytes(),
+        np.array(first, dtype="<u4").tobytes(),
+        offsets.tobytes(),
+        b"".join(strings),
+    ]
+    positions, pos = [], _align(HEADER.size)
+    for section in sections:
+        positions.append(pos)
+        pos = _align(pos + len(section))
+
+    out = out or compiled_path(source)
+    tmp = f"{out}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, count, len(strings), len(meta), *positions))
+        for position, section in zip(positions, sections):
+            f.seek(position)
+            f.write(section)
+    os.replace(tmp, out)
+    return out, count
+
+
+# ---------- loader ----------
+class _Questions(Sequence):
+    """Lazy sequence over a CompiledBank: decodes one record per index."""
+
+    def __init__(self, bank):
+        self.bank = bank
+
+    def __len__(self):
+        return self.bank.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.bank.question(j) for j in range(*i.indices(len(self)))]
+        return self.bank.question(i)
+
+
+class CompiledBank:
+    """Read-only, memory-mapped .qbank with the same fields as
+    question_bank.QuestionBank (questions is a lazy sequence)."""
+
+    def __init__(self, path):
+        from question_bank import BankError
+
+        self.path = path
+        self.mtime = os.stat(path).st_mtime_ns
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = HEADER.unpack_from(self.mm, 0)
+        magic, version, _, count, n_strings, meta_len = header[:6]
+        if magic != MAGIC or version != VERSION:
+            raise BankError(f"{path}: not a version {VERSION} question bank")
+        meta_off, correct_off, points_off, nopt_off, first_off, offsets_off, self.strings_off = header[6:]
+
+        meta = json.loads(self.mm[meta_off:meta_off + meta_len].decode("utf-8"))
+        self.id = meta["id"]
+        self.title = meta["title"]
+        self.description = meta["description"]
+        self.level = meta["level"]
+        self.is_active = meta["is_active"]
+
+        self.count = count
+        self.correct = np.frombuffer(self.mm, "<i2", count, correct_off)
+        self.points = np.frombuffer(self.mm, "<i4", count, points_off)
+        self.n_options = np.frombuffer(self.mm, "u1", count, nopt_off)
+        self.first = np.frombuffer(self.mm, "<u4", count, first_off)
+        self.offsets = np.frombuffer(self.mm, "<u8", n_strings + 1, offsets_off)
+        self.questions = _Questions(self)
+
+    def _string(self, j):
+        start = self.strings_off + int(self.offsets[j])
+        end = self.strings_off + int(self.offsets[j + 1])
+        return self.mm[start:end].decode("utf-8")
+
+    def question(self, i):
+        from question_bank import Question
+
+        if not -self.count <= i < self.count:
+            raise IndexError(i)
+        i %= self.count
+        first = int(self.first[i])
+        options = tuple(self._string(first + 1 + k) for k in range(int(self.n_options[i])))
+        correct = int(self.correct[i])
+        return Question(self._string(first), options, options[correct], correct, int(self.points[i]))
+
+    def sample(self, k, rng=random):
+        """k random questions, decoding only those records."""
+        return [self.question(i) for i in rng.sample(range(self.count), min(k, self.count))]
+
+
+def load_compiled(source):
+    """Questions of `source` as the dicts tkinter/quiz_file.py uses, from
+    its compiled file; None when there is no up-to-date compiled file."""
+    path = fresh_compiled(source)
+    if path is None:
+        return None
+    bank = CompiledBank(path)
+    return [{"question": q.question, "options": list(q.options), "answer": q.answer}
+            for q in bank.questions]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile question banks to the indexed .qbank format")
+    parser.add_argument("sources", nargs="*",
+                        help="bank .json / quiz .txt files (default: every streamlit and tkinter bank)")
+    args = parser.parse_args(argv)
+
+    sources = args.sources or sorted(p for pattern in SOURCES for p in glob.glob(pattern))
+    for source in sources:
+        out, count = compile_bank(source)
+        print(f"✅ {source} -> {out} ({count} questions, {os.path.getsize(out) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+from typing import NamedTuple
+
+import numpy as np
+
+from qbank import CompiledBank, fresh_compiled
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+QUESTIONS_DIR = os.path.join(BASE_DIR, "questions")
+
+# ✅ Subject name -> question file prefix
+SUBJECT_FILES = {
+    "C": "c",
+    "C++": "cpp",
+    "Python": "python",
+}
+
+
+class BankError(ValueError):
+    """A question file that is missing or does not validate."""
+
+
+class Question(NamedTuple):
+    question: str
+    options: tuple
+    answer: str
+    correct: int      # index of `answer` in `options`, computed once at load
+    points: int
+
+
+class QuestionBank(NamedTuple):
+    id: object
+    title: str
+    description: str
+    level: str
+    is_active: bool
+    questions: tuple  # of Question
+    correct: np.ndarray  # answer key: correct option index per question (read-only)
+    points: np.ndarray   # points per question (read-only)
+    path: str
+    mtime: int        # st_mtime_ns of the file this was parsed from
+
+
+def _frozen(values, dtype):
+    array = np.array(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+
+def bank_path(subject, level):
+    prefix = SUBJECT_FILES.get(subject)
+    if prefix is None or not level:
+        raise BankError(f"Unknown subject/level: {subject!r} / {level!r}")
+    return os.path.join(QUESTIONS_DIR, f"{prefix}_{level[0]}.json")
+
+
+def parse_question(raw, n):
+    try:
+        options = tuple(str(o) for o in raw["options"])
+        answer = str(raw["answer"])
+        points = int(raw.get("points", 1))
+        text = str(raw["question"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise BankError(f"question {n}: {e!r}") from None
+    if answer not in options:
+        raise BankError(f"question {n}: answer {answer!r} is not one of its options")
+    return Question(text, options, answer, options.index(answer), points)
+
+
+def parse_bank(data, path, mtime=0):
+    questions = tuple(parse_question(q, n) for n, q in enumerate(data.get("questions", []), 1))
+    return QuestionBank(
+        id=data.get("id", "N/A"),
+        title=data.get("title", "Untitled Quiz"),
+        description=data.get("description", ""),
+        level=data.get("level", ""),
+        is_active=data.get("is_active", True),
+        questions=questions,
+        correct=_frozen([q.correct for q in questions], np.int16),
+        points=_frozen([q.points for q in questions], np.int64),
+        path=path,
+        mtime=mtime,
+    )
+
+
+def read_bank(path):
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        raise BankError(f"Quiz file not found: {path}") from None
+    except json.JSONDecodeError as e:
+        raise BankError(f"{path}: {e}") from None
+    try:
+        return parse_bank(data, path, mtime)
+    except BankError as e:
+        raise BankError(f"{path}: {e}") from None
+
+
+# ---------------------------------------------------------
+# PROCESS-WIDE CACHE
+# ---------------------------------------------------------
+# One bank per file, shared by every session (banks are immutable). A
+# stat() per lookup; the file is re-read only when its mtime changes. An
+# up-to-date compiled .qbank (see qbank.py) is memory-mapped instead of
+# parsing the JSON.
+
+_banks = {}
+_banks_lock = threading.Lock()
+
+
+def open_bank(source):
+    return CompiledBank(source) if source.endswith(".qbank") else read_bank(source)
+
+
+def load_bank(subject, level):
+    path = bank_path(subject, level)
+    source = fresh_compiled(path) or path
+    try:
+        mtime = os.stat(source).st_mtime_ns
+    except FileNotFoundError:
+        raise BankError(f"Quiz file not found: {path}") from None
+
+    bank = _banks.get(path)
+    if bank is not None and bank.path == source and bank.mtime == mtime:
+        return bank
+
+    with _banks_lock:
+        bank = _banks.get(path)
+        if bank is None or bank.path != source or bank.mtime != mtime:
+            bank = open_bank(source)
+            _banks[path] = bank
+        return bank
+
+
+def clear_cache():
+    with _banks_lock:
+        _banks.clear()
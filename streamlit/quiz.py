@@ -1,36 +1,37 @@
 import streamlit as st
-import json
 import os
 import random
 from datetime import datetime
-import csv
 import html
-import subprocess
+import sys
+import uuid
 
 # Path to project root
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-SUSPECT_FILE = os.path.join(PROJECT_ROOT, "suspect_count.json")
+DETECTION_DIR = os.path.join(PROJECT_ROOT, "detection")
+if DETECTION_DIR not in sys.path:
+    sys.path.append(DETECTION_DIR)
 
-# ✅ Save User Scores
-def save_user_scores(user_scores):
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    user_scores_path = os.path.join(current_dir, "user_scores.json")
-    with open(user_scores_path, "w", encoding="utf-8") as f:
-        json.dump(user_scores, f, indent=4)
+from suspicion import shared_service, session_id
+from question_bank import load_bank, BankError
+from grading import chosen_array, grade
+from assets import use_css, asset_url
+from storage import shared_storage
+from launcher import shared_pool
 
+QUIZ_LENGTH = 20
 
-# ✅ Save to CSV
-def save_to_csv(username, quiz_id, quiz_title, score, completed_at,sus_percentage):
-    csv_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scores.csv")
-    file_exists = os.path.isfile(csv_file)
+# ✅ Suspicion counter key for this candidate's current attempt
+def suspicion_session():
+    return session_id(st.session_state.username, st.session_state.attempt_id)
 
-    with open(csv_file, "a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
 
-        if not file_exists:
-            writer.writerow(["username", "quiz_id", "quiz_title", "score", "completed_at","sus_percentage"])
-
-        writer.writerow([username, quiz_id, quiz_title, score, completed_at, sus_percentage])
+# ✅ Hands the leased monitor worker back to the pool (it holds the camera + microphone);
+# must run before session state is cleared, or the worker stays leased for good
+def stop_monitoring():
+    monitor = st.session_state.pop("monitor_proc", None)
+    if monitor is not None:
+        shared_pool().release(monitor)
 
 
 # ✅ Main Quiz App
@@ -39,11 +40,14 @@ def show_quiz_app():
     st.set_page_config(page_title="PrepSecure", page_icon="🎯", layout="wide")
     st.title("🎯 Quiz Master Pro")
 
+    # ✅ Page styles (assets/quiz.css): a <link> per full run, the file itself is cached
+    use_css("quiz.css")
+
     # ✅ Initialize States
     default_states = {
         "selected_subject": None,
         "selected_level": None,
-        "current_quiz": None,
+        "quiz_order": None,
         "current_question": 0,
         "score": 0,
         "quiz_completed": False,
@@ -66,6 +70,7 @@ def show_quiz_app():
         st.success(f"✅ Logged in as: {st.session_state.username}")
 
         if st.button("🚪 Logout", use_container_width=True):
+            stop_monitoring()
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
             st.rerun()
@@ -78,30 +83,11 @@ def show_quiz_app():
         st.subheader("Choose Your Subject")
 
         subjects = [
-            {"name": "C", "img": "https://img.icons8.com/color/150/c-programming.png", "desc": "Efficient systems programming"},
-            {"name": "C++", "img": "https://img.icons8.com/color/150/c-plus-plus-logo.png", "desc": "Object-oriented programming"},
-            {"name": "Python", "img": "https://img.icons8.com/color/150/python.png", "desc": "Rapid scripting & automation"}
+            {"name": "C", "img": asset_url("img/c.svg"), "desc": "Efficient systems programming"},
+            {"name": "C++", "img": asset_url("img/cpp.svg"), "desc": "Object-oriented programming"},
+            {"name": "Python", "img": asset_url("img/python.svg"), "desc": "Rapid scripting & automation"}
         ]
 
-        st.markdown("""
-            <style>
-                .subject-container {
-                    text-align: center;
-                    padding: 20px;
-                    display: flex;
-                    flex-direction: column;
-                    justify-content: flex-start;
-                    align-items: center;
-                    min-height: 330px;
-                }
-                .center-btn {
-                    display: flex;
-                    justify-content: center;
-                    margin-top: 10px;
-                }
-            </style>
-        """, unsafe_allow_html=True)
-
         cols = st.columns(3)
 
         for i, card in enumerate(subjects):
@@ -138,27 +124,6 @@ def show_quiz_app():
             {"level": "advanced", "color": "linear-gradient(135deg,#f6d365 0%, #fda085 100%)", "desc": "Challenge yourself", "emoji": "🔥"}
         ]
 
-        st.markdown("""
-        <style>
-            .level-card {
-                width: 100%;
-                padding: 24px;
-                border-radius: 18px;
-                color: white;
-                text-align: center;
-                box-shadow: 0 4px 20px rgba(0,0,0,0.20);
-                display: flex;
-                flex-direction: column;
-                justify-content: center;
-                transition: 0.25s;
-            }
-            .level-card:hover {
-                transform: translateY(-6px) scale(1.02);
-                box-shadow: 0 12px 28px rgba(0,0,0,0.28);
-            }
-        </style>
-        """, unsafe_allow_html=True)
-
         cols = st.columns(3)
 
         for i, item in enumerate(LEVELS):
@@ -182,51 +147,30 @@ def show_quiz_app():
         st.stop()
 
     # -----------------------------------------
-    # ✅ LOAD JSON QUIZ FILE (WITH C++ MAPPING FIX)
+    # ✅ LOAD QUESTION BANK (process-wide cache, re-read only when the file changes)
     # -----------------------------------------
 
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    questions_dir = os.path.join(current_dir, "questions")
-
-    # ✅ Correct mapping for file prefix
-    file_map = {
-        "C": "c",
-        "C++": "cpp",
-        "Python": "python"
-    }
+    try:
+        quiz = load_bank(st.session_state.selected_subject, st.session_state.selected_level)
+    except BankError as e:
+        st.error(f"❌ {e}")
+        st.stop()
 
-    subject_prefix = file_map.get(st.session_state.selected_subject)
+    # ✅ Only this attempt's sampled order lives in the session
+    order = st.session_state.quiz_order
+    if order is None or max(order, default=-1) >= len(quiz.questions):
+        order = random.sample(range(len(quiz.questions)), min(QUIZ_LENGTH, len(quiz.questions)))
+        st.session_state.quiz_order = order
+        st.session_state.attempt_id = uuid.uuid4().hex[:12]
 
-    file_path = os.path.join(
-        questions_dir,
-        f"{subject_prefix}_{st.session_state.selected_level[0]}.json"
-    )
-
-    if st.session_state.current_quiz is None:
-        if os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8") as f:
-                quiz = json.load(f)
-            all_q = quiz.get("questions", [])
-            quiz["questions"] = random.sample(all_q, min(20, len(all_q)))
-            st.session_state.current_quiz = quiz
-        else:
-            st.error(f"❌ Quiz file not found: {file_path}")
-            st.stop()
-
-    quiz = st.session_state.current_quiz
-    questions = quiz["questions"]
+    questions = [quiz.questions[i] for i in order]
 
     # -----------------------------------------
     # ✅ QUIZ COMPLETED
     # -----------------------------------------
     if st.session_state.quiz_completed:
-        # ✅ Load suspicion count
-        sus_path = SUSPECT_FILE
-
-        if os.path.exists(sus_path):
-            sus_count = json.load(open(SUSPECT_FILE)).get("current", 0)
-        else:
-            sus_count = 0
+        # ✅ Suspicion count captured at submit time
+        sus_count = st.session_state.get("sus_count", 0)
 
         total_q = len(questions)
         sus_percentage = min(int((sus_count / total_q) * 100), 100)
@@ -235,51 +179,40 @@ def show_quiz_app():
         st.balloons()
         st.header("🎊 Quiz Completed!")
 
-        total_points = sum(q["points"] for q in questions)
+        total_points = sum(q.points for q in questions)
         st.subheader(f"Your Score: {st.session_state.score}/{total_points}")
 
         uname = st.session_state.username
-        user_scores_path = os.path.join(current_dir, "user_scores.json")
-
-        if os.path.exists(user_scores_path):
-            with open(user_scores_path, "r", encoding="utf-8") as f:
-                old_data = json.load(f)
-        else:
-            old_data = {}
-
-        if uname not in old_data:
-            old_data[uname] = {}
 
         subject_name = st.session_state.get("selected_subject", "Unknown")
         quiz_level = st.session_state.get("selected_level", "Unknown").title()
+        completed_at = datetime.now().isoformat()
 
-        old_data[uname][str(quiz["id"])] = {
-            "quiz_title": quiz.get("title", "Untitled Quiz"),
-            "subject": subject_name,
-            "level": quiz_level,
-            "score": st.session_state.score,
-            "suspicion_percent": sus_percentage,
-            "completed_at": datetime.now().isoformat()
-        }
-
-        save_user_scores(old_data)
-
-        save_to_csv(
+        # ✅ One appended row (the latest-attempt view updates itself); reruns of
+        # this page save the same attempt_id again, which is a no-op
+        shared_storage().record_attempt(
             uname,
-            quiz.get("id", "N/A"),
-            quiz.get("title", "Untitled Quiz"),
+            quiz.id,
+            quiz.title,
+            subject_name,
+            quiz_level,
             st.session_state.score,
-            datetime.now().isoformat(),
-            sus_percentage
+            sus_percentage,
+            st.session_state.attempt_id,
+            # ✅ kept so the attempt can be re-graded after a question fix
+            questions=order,
+            answers=chosen_array(st.session_state.answers, len(order)).tolist(),
+            completed_at=completed_at,
         )
 
         st.success("✅ Your score has been saved successfully!")
 
         if st.button("Take Another Quiz", key="retry_quiz"):
+            stop_monitoring()
             for key in [
                 "selected_subject", "selected_level",
-                "current_quiz", "current_question",
-                "score", "quiz_completed", "answers"
+                "quiz_order", "current_question",
+                "score", "quiz_completed", "answers", "sus_count", "attempt_id"
             ]:
                 del st.session_state[key]
             st.rerun()
@@ -290,42 +223,39 @@ def show_quiz_app():
     # ✅ QUIZ RUNNING
     # -----------------------------------------
 
-    idx = st.session_state.current_question
     if not st.session_state.get("quiz_started", False):
         st.session_state.quiz_started = True
 
+    # ✅ Answer clicks and navigation only re-run the question fragment below
+    show_question(quiz, order, questions)
+
+
+# ✅ Navigation callbacks run before the fragment re-executes, so one click is one run
+def go_to_question(idx):
+    st.session_state.current_question = idx
+
+
+def set_ask_submit(value):
+    st.session_state.ask_submit = value
+
+
+# ✅ Question card + answer + navigation (re-runs on its own)
+@st.fragment
+def show_question(quiz, order, questions):
+
+    idx = st.session_state.current_question
     q = questions[idx]
 
     st.progress((idx + 1) / len(questions))
 
-    st.markdown("""
-    <style>
-    .question-card {
-        background: rgba(255,255,255,0.08);
-        backdrop-filter: blur(12px);
-        border-radius: 18px;
-        border: 1px solid rgba(255,255,255,0.15);
-        padding: 28px;
-        margin-bottom: 20px;
-        color: white;
-    }
-    .question-text {
-        font-size: 22px;
-        line-height: 1.6;
-        color: white;
-        font-family: 'Fira Code', 'Consolas', 'Courier New';
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
     st.markdown(f"""
     <div class="question-card">
         <h3 style="color:white;">Question {idx+1} of {len(questions)}</h3>
-        <p class="question-text">{q["question"]}</p>
+        <p class="question-text">{q.question}</p>
     </div>
     """, unsafe_allow_html=True)
 
-    options = list(enumerate(q["options"]))
+    options = list(enumerate(q.options))
 
     prev_index = st.session_state.answers.get(idx, None)
 
@@ -346,19 +276,14 @@ def show_quiz_app():
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        if st.button("⬅ Previous Question", disabled=(idx == 0)):
-            st.session_state.current_question -= 1
-            st.rerun()
+        st.button("⬅ Previous Question", disabled=(idx == 0),
+                  on_click=go_to_question, args=(idx - 1,))
 
     with col3:
         if idx < len(questions) - 1:
-            if st.button("Next ➡"):
-                st.session_state.current_question += 1
-                st.rerun()
+            st.button("Next ➡", on_click=go_to_question, args=(idx + 1,))
         else:
-            if st.button("✅ Finish Quiz"):
-                st.session_state.ask_submit = True
-                st.rerun()
+            st.button("✅ Finish Quiz", on_click=set_ask_submit, args=(True,))
 
     if idx == len(questions) - 1:
 
@@ -370,29 +295,23 @@ def show_quiz_app():
 
             with colA:
                 if st.button("✅ Yes, Submit"):
-                    
-                    sus_path = SUSPECT_FILE
 
-                    st.session_state.score = 0
-                    for i, que in enumerate(questions):
-                        user_index = st.session_state.answers.get(i)
-                        correct_index = que["options"].index(que["answer"])
-                        if user_index == correct_index:
-                            st.session_state.score += que["points"]
+                    # ✅ One vectorised comparison against the bank's answer key
+                    chosen = chosen_array(st.session_state.answers, len(order))
+                    st.session_state.score = grade(quiz, order, chosen)
+
+                    # ✅ Only this attempt's counter (in-memory lookup)
+                    counter, _ = shared_service()
+                    st.session_state.sus_count = counter.total(suspicion_session())
 
                     st.session_state.quiz_completed = True
                     st.session_state.ask_submit = False
-                    json.dump({"current": 0}, open(SUSPECT_FILE, "w"))
-                    
-                    
-                    st.rerun()
 
-            with colB:
-                if st.button("❌ No, go back"):
-                    st.session_state.ask_submit = False
-                    
+                    # ✅ Full rerun: the results page replaces the whole quiz view
                     st.rerun()
 
+            with colB:
+                st.button("❌ No, go back", on_click=set_ask_submit, args=(False,))
 
 
 
@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+# ---------------------------------------------------------
+# LOGIN RATE LIMITING (in memory)
+# ---------------------------------------------------------
+# Two sliding windows, checked before the account lookup and the
+# password hash, so a brute-force burst is turned away for the price of
+# a dict lookup:
+#
+#   per username  USER_FAILURES failed logins per USER_WINDOW seconds;
+#                 after that the account is locked until the oldest
+#                 failure leaves the window (a good login clears it)
+#   per client    CLIENT_ATTEMPTS logins of any outcome per CLIENT_WINDOW
+#                 seconds from one address (password spraying across
+#                 many usernames); skipped when the address is unknown
+#
+# Each key keeps at most `limit` timestamps (a bounded deque). Keys sit
+# in an OrderedDict by last use, so the ones whose window has passed are
+# always at the front and are dropped as new events arrive (TTL
+# eviction); MAX_KEYS caps memory if an attacker rotates usernames.
+
+USER_FAILURES = 5
+USER_WINDOW = 300
+CLIENT_ATTEMPTS = 20
+CLIENT_WINDOW = 60
+MAX_KEYS = 100_000
+
+
+class SlidingWindow:
+    """At most `limit` events per `window` seconds for each key."""
+
+    def __init__(self, limit, window, max_keys=MAX_KEYS):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self.events = OrderedDict()   # key -> deque of event times, least recently used first
+        self.lock = threading.Lock()
+
+    def _evict(self, now):
+        while self.events:
+            key, times = next(iter(self.events.items()))
+            if times[-1] > now - self.window and len(self.events) <= self.max_keys:
+                return
+            del self.events[key]
+
+    def _retry_after(self, key, now):
+        times = self.events.get(key)
+        if times is None or len(times) < self.limit:
+            return 0.0
+        return max(0.0, times[0] + self.window - now)
+
+    def retry_after(self, key, now=None):
+        """Seconds until `key` may have another event (0 = now)."""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            return self._retry_after(key, now)
+
+    def add(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self._add(key, now)
+
+    def _add(self, key, now):
+        times = self.events.get(key)
+        if times is None:
+            times = self.events[key] = deque(maxlen=self.limit)
+        else:
+            self.events.move_to_end(key)
+        times.append(now)
+        self._evict(now)
+
+    def hit(self, key, now=None):
+        """Records an event if allowed; returns retry_after (0 = recorded)."""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            wait = self._retry_after(key, now)
+            if not wait:
+                self._add(key, now)
+            return wait
+
+    def reset(self, key):
+        with self.lock:
+            self.events.pop(key, None)
+
+    def __len__(self):
+        return len(self.events)
+
+
+class LoginLimiter:
+    """The per-username and per-client windows used by login.py."""
+
+    def __init__(self, user_failures=USER_FAILURES, user_window=USER_WINDOW,
+                 client_attempts=CLIENT_ATTEMPTS, client_window=CLIENT_WINDOW):
+        self.failures = SlidingWindow(user_failures, user_window)
+        self.clients = SlidingWindow(client_attempts, client_window)
+
+    def check(self, username, client):
+        """Counts one attempt from `client`; returns how many seconds to
+        wait (0 = go ahead and verify the password). With client None
+        (address unknown) only the username window applies: unrelated
+        clients must not share one bucket."""
+        wait = self.clients.hit(client) if client is not None else 0.0
+        return max(wait, self.failures.retry_after(username.lower()))
+
+    def failed(self, username):
+        self.failures.add(username.lower())
+
+    def succeeded(self, username):
+        self.failures.reset(username.lower())
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def shared_limiter():
+    """The server's LoginLimiter (state is per process)."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = LoginLimiter()
+        return _limiter
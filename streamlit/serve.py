@@ -0,0 +1,14 @@
+import streamlit as st
+from starlette.middleware import Middleware
+
+from assets import LongCacheMiddleware, build
+
+
+# ✅ Production entry point: same app as `streamlit run web.py`, plus
+# long-lived Cache-Control on the hashed static assets.
+#
+#   streamlit run serve.py        (or: uvicorn serve:app)
+
+build()
+
+app = st.App("web.py", middleware=[Middleware(LongCacheMiddleware)])
@@ -0,0 +1,480 @@
+import argparse
+import csv
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# ---------------------------------------------------------
+# QUIZ DATABASE (SQLite, WAL)
+# ---------------------------------------------------------
+# One file for what used to live in users.json, user_scores.json and
+# scores.csv:
+#
+#   users            one row per account (primary key: username)
+#   attempts         every finished quiz, append-only (an INSERT, never a
+#                    rewrite of the history)
+#   latest_attempts  materialized "latest attempt per user and quiz" view,
+#                    kept current by a trigger in the same transaction as
+#                    the insert
+#
+# All access goes through a small connection pool; writes are
+# transactions that take the write lock up front (BEGIN IMMEDIATE), so
+# concurrent sign-ups and finishers queue instead of losing each other's
+# changes. The old files are imported once, on first open.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BASE_DIR)
+DB_PATH = os.path.join(BASE_DIR, "quiz.db")
+
+# ✅ Legacy files (imported once, then no longer written)
+LEGACY_USERS = [
+    os.path.join(PROJECT_ROOT, "users.json"),   # admin.py / login.py run from the project root
+    os.path.join(BASE_DIR, "users.json"),       # login.py run from streamlit/
+]
+LEGACY_SCORES = os.path.join(BASE_DIR, "user_scores.json")
+LEGACY_CSV = os.path.join(BASE_DIR, "scores.csv")
+
+POOL_SIZE = 8          # open connections per process
+BUSY_TIMEOUT = 10.0    # seconds a writer waits for another writer's transaction
+SAME_ATTEMPT = 60      # seconds: a scores.csv row this close to a stored attempt is that attempt
+
+# ✅ Schema migrations, applied in order; PRAGMA user_version = how many ran
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS meta (
+        key   TEXT PRIMARY KEY,
+        value TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS attempts (
+        id                INTEGER PRIMARY KEY,
+        attempt_id        TEXT UNIQUE,          -- the quiz session's id; makes saving idempotent
+        username          TEXT NOT NULL,
+        quiz_id           TEXT NOT NULL,
+        quiz_title        TEXT,
+        subject           TEXT,
+        level             TEXT,
+        score             INTEGER NOT NULL,
+        suspicion_percent INTEGER NOT NULL DEFAULT 0,
+        questions         TEXT,                 -- JSON: bank indices asked (for re-grading)
+        answers           TEXT,                 -- JSON: option chosen per question, -1 = blank
+        completed_at      TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS latest_attempts (
+        username TEXT NOT NULL,
+        quiz_id  TEXT NOT NULL,
+        attempt  INTEGER NOT NULL REFERENCES attempts(id),
+        PRIMARY KEY (username, quiz_id)
+    ) WITHOUT ROWID;
+
+    CREATE TRIGGER IF NOT EXISTS attempts_latest AFTER INSERT ON attempts BEGIN
+        INSERT INTO latest_attempts (username, quiz_id, attempt)
+        VALUES (NEW.username, NEW.quiz_id, NEW.id)
+        ON CONFLICT (username, quiz_id) DO UPDATE SET attempt = excluded.attempt;
+    END;
+    """,
+    """
+    CREATE TABLE users (
+        username   TEXT PRIMARY KEY,
+        password   TEXT NOT NULL,
+        role       TEXT NOT NULL DEFAULT 'user',
+        created_at TEXT
+    );
+    CREATE INDEX users_role ON users (role);
+
+    CREATE INDEX attempts_user ON attempts (username);
+    CREATE INDEX attempts_subject ON attempts (subject, level);
+
+    -- history imported out of order must not replace a newer latest attempt
+    DROP TRIGGER attempts_latest;
+    CREATE TRIGGER attempts_latest AFTER INSERT ON attempts BEGIN
+        INSERT INTO latest_attempts (username, quiz_id, attempt)
+        VALUES (NEW.username, NEW.quiz_id, NEW.id)
+        ON CONFLICT (username, quiz_id) DO UPDATE SET attempt = excluded.attempt
+        WHERE (SELECT completed_at FROM attempts WHERE id = latest_attempts.attempt) <= NEW.completed_at;
+    END;
+    """,
+    """
+    -- bumped on every change to users, so caches (credentials.py) know when to drop entries
+    INSERT OR IGNORE INTO meta (key, value) VALUES ('users_version', 0);
+    CREATE TRIGGER users_insert_version AFTER INSERT ON users BEGIN
+        UPDATE meta SET value = value + 1 WHERE key = 'users_version';
+    END;
+    CREATE TRIGGER users_update_version AFTER UPDATE ON users BEGIN
+        UPDATE meta SET value = value + 1 WHERE key = 'users_version';
+    END;
+    CREATE TRIGGER users_delete_version AFTER DELETE ON users BEGIN
+        UPDATE meta SET value = value + 1 WHERE key = 'users_version';
+    END;
+    """,
+]
+
+ATTEMPT_COLUMNS = ("attempt_id", "username", "quiz_id", "quiz_title", "subject", "level",
+                   "score", "suspicion_percent", "questions", "answers", "completed_at")
+INSERT_ATTEMPT = (f"INSERT INTO attempts ({', '.join(ATTEMPT_COLUMNS)}) "
+                  f"VALUES ({', '.join('?' * len(ATTEMPT_COLUMNS))}) "
+                  "ON CONFLICT (attempt_id) DO NOTHING")
+
+
+def _record(row):
+    """attempts row -> the dict shape user_scores.json used."""
+    record = dict(row)
+    for key in ("questions", "answers"):
+        if record.get(key) is not None:
+            record[key] = json.loads(record[key])
+    return record
+
+
+def _int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class ConnectionPool:
+    """Up to `size` open connections, each used by one caller at a time."""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+
+    def _open(self):
+        db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                             check_same_thread=False)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("PRAGMA foreign_keys=ON")
+        return db
+
+    @contextmanager
+    def connection(self):
+        self.slots.acquire()
+        try:
+            try:
+                db = self.idle.get_nowait()
+            except queue.Empty:
+                db = self._open()
+            try:
+                yield db
+            finally:
+                if db.in_transaction:
+                    db.execute("ROLLBACK")
+                self.idle.put(db)
+        finally:
+            self.slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class Storage:
+    """The quiz database (see the module comment). Reads use read();
+    writes use transaction()."""
+
+    def __init__(self, path=DB_PATH, pool_size=POOL_SIZE,
+                 legacy_users=LEGACY_USERS, legacy_scores=LEGACY_SCORES, legacy_csv=LEGACY_CSV):
+        self.path = path
+        self.pool = ConnectionPool(path, pool_size)
+        self._migrate()
+        self._import_legacy(legacy_users, legacy_scores, legacy_csv)
+
+    # ---------- connections ----------
+    @contextmanager
+    def read(self):
+        with self.pool.connection() as db:
+            yield db
+
+    @contextmanager
+    def transaction(self):
+        with self.pool.connection() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    def close(self):
+        self.pool.close()
+
+    # ---------- schema + one-time imports ----------
+    def _migrate(self):
+        with self.transaction() as db:
+            version = db.execute("PRAGMA user_version").fetchone()[0]
+            for n, script in enumerate(MIGRATIONS[version:], version + 1):
+                for statement in _statements(script):
+                    db.execute(statement)
+                db.execute(f"PRAGMA user_version = {n}")
+
+    def _import_legacy(self, legacy_users, legacy_scores, legacy_csv):
+        steps = [
+            ("imported_users", lambda db: self._import_users(db, legacy_users)),
+            ("imported_user_scores", lambda db: self._import_scores(db, legacy_scores)),
+            ("imported_scores_csv", lambda db: self._import_csv(db, legacy_csv)),
+        ]
+        with self.transaction() as db:
+            done = {row[0] for row in db.execute("SELECT key FROM meta")}
+            for key, step in steps:
+                if key not in done:
+                    db.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (key, str(step(db))))
+
+    @staticmethod
+    def _load_json(path):
+        if not path or not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return {}
+
+    def _import_users(self, db, paths):
+        """users.json files ({username: {password, role}}); the first file wins."""
+        rows = []
+        for path in paths or []:
+            for username, info in self._load_json(path).items():
+                if info.get("password"):
+                    rows.append((username, info["password"], info.get("role", "user")))
+        cursor = db.executemany(
+            "INSERT INTO users (username, password, role) VALUES (?, ?, ?) "
+            "ON CONFLICT (username) DO NOTHING", rows)
+        return cursor.rowcount
+
+    def _import_scores(self, db, path):
+        """user_scores.json ({user: {quiz_id: record}}): the latest attempts."""
+        rows = []
+        for username, quizzes in self._load_json(path).items():
+            for quiz_id, r in quizzes.items():
+                rows.append((r.get("attempt_id"), username, str(quiz_id), r.get("quiz_title"),
+                             r.get("subject"), r.get("level"), _int(r.get("score")),
+                             _int(r.get("suspicion_percent")),
+                             json.dumps(r["questions"]) if r.get("questions") else None,
+                             json.dumps(r["answers"]) if "answers" in r else None,
+                             r.get("completed_at") or ""))
+        db.executemany(INSERT_ATTEMPT, rows)
+        return len(rows)
+
+    def _import_csv(self, db, path):
+        """scores.csv: the full history. Each attempt already imported from
+        user_scores.json hides the closest CSV row with the same user, quiz
+        and score within SAME_ATTEMPT seconds. Older files name the
+        suspicion column sus_percentage or the date column timestamp."""
+        if not path or not os.path.exists(path):
+            return 0
+
+        def seconds(t):
+            try:
+                return datetime.fromisoformat(t).timestamp()
+            except ValueError:
+                return None
+
+        rows = []
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            for r in csv.DictReader(f):
+                if not r.get("username"):
+                    continue
+                suspicion = r.get("suspicion_percent", r.get("sus_percentage"))
+                rows.append((None, r["username"], str(r.get("quiz_id", "")), r.get("quiz_title"),
+                             None, None, _int(r.get("score")), _int(suspicion), None, None,
+                             r.get("completed_at") or r.get("timestamp") or ""))
+
+        by_key = {}
+        for i, row in enumerate(rows):
+            by_key.setdefault((row[1], row[2], row[6]), []).append(i)
+        duplicates = set()
+        for row in db.execute("SELECT username, quiz_id, score, completed_at FROM attempts"):
+            at = seconds(row[3])
+            if at is None:
+                continue
+            close = []
+            for i in by_key.get(tuple(row[:3]), []):
+                t = seconds(rows[i][10])
+                if i not in duplicates and t is not None and abs(t - at) < SAME_ATTEMPT:
+                    close.append((abs(t - at), i))
+            if close:
+                duplicates.add(min(close)[1])
+
+        rows = [row for i, row in enumerate(rows) if i not in duplicates]
+        db.executemany(INSERT_ATTEMPT, rows)
+        return len(rows)
+
+    # ---------- users ----------
+    def get_user(self, username):
+        """{"username", "password", "role"} or None (primary-key lookup)."""
+        with self.read() as db:
+            row = db.execute("SELECT username, password, role FROM users WHERE username = ?",
+                             (username,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def add_user(self, username, password, role="user"):
+        """Inserts one account; False when the username is taken."""
+        with self.transaction() as db:
+            cursor = db.execute(
+                "INSERT INTO users (username, password, role, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (username) DO NOTHING",
+                (username, password, role, datetime.now().isoformat()))
+            return cursor.rowcount == 1
+
+    def set_password(self, username, password, old=None):
+        """Replaces the stored hash; with `old`, only if it is still that
+        one (a concurrent change wins). True when a row changed."""
+        with self.transaction() as db:
+            if old is None:
+                cursor = db.execute("UPDATE users SET password = ? WHERE username = ?", (password, username))
+            else:
+                cursor = db.execute("UPDATE users SET password = ? WHERE username = ? AND password = ?",
+                                    (password, username, old))
+            return cursor.rowcount == 1
+
+    def set_role(self, username, role):
+        with self.transaction() as db:
+            db.execute("UPDATE users SET role = ? WHERE username = ?", (role, username))
+
+    def delete_user(self, username):
+        """The account and all of its attempts, in one transaction."""
+        with self.transaction() as db:
+            db.execute("DELETE FROM latest_attempts WHERE username = ?", (username,))
+            db.execute("DELETE FROM attempts WHERE username = ?", (username,))
+            db.execute("DELETE FROM users WHERE username = ?", (username,))
+
+    def usernames(self, role=None):
+        with self.read() as db:
+            if role is None:
+                rows = db.execute("SELECT username FROM users ORDER BY rowid").fetchall()
+            else:
+                rows = db.execute("SELECT username FROM users WHERE role = ? ORDER BY rowid",
+                                  (role,)).fetchall()
+        return [row[0] for row in rows]
+
+    def users_version(self):
+        """Changes whenever any account is added, edited or deleted."""
+        with self.read() as db:
+            return int(db.execute("SELECT value FROM meta WHERE key = 'users_version'").fetchone()[0])
+
+    def user_count(self, role=None):
+        with self.read() as db:
+            if role is None:
+                return db.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+            return db.execute("SELECT COUNT(*) FROM users WHERE role = ?", (role,)).fetchone()[0]
+
+    # ---------- attempts ----------
+    def record_attempt(self, username, quiz_id, quiz_title, subject, level, score,
+                       suspicion_percent, attempt_id, questions=None, answers=None,
+                       completed_at=None):
+        """Appends one finished attempt. Saving the same attempt_id again
+        is a no-op; returns True when the row was new."""
+        with self.transaction() as db:
+            cursor = db.execute(
+                INSERT_ATTEMPT,
+                (attempt_id, username, str(quiz_id), quiz_title, subject, level, int(score),
+                 int(suspicion_percent),
+                 json.dumps(list(questions)) if questions is not None else None,
+                 json.dumps(list(answers)) if answers is not None else None,
+                 completed_at or datetime.now().isoformat()))
+            return cursor.rowcount == 1
+
+    def latest_scores(self, subject=None):
+        """{username: {quiz_id: record}} from the latest-attempt view,
+        optionally for one subject."""
+        query = "SELECT a.* FROM latest_attempts l JOIN attempts a ON a.id = l.attempt"
+        params = ()
+        if subject is not None:
+            query += " WHERE a.subject = ?"
+            params = (subject,)
+        with self.read() as db:
+            rows = db.execute(query + " ORDER BY a.username, a.quiz_id", params).fetchall()
+        user_scores = {}
+        for row in rows:
+            user_scores.setdefault(row["username"], {})[row["quiz_id"]] = _record(row)
+        return user_scores
+
+    def attempt_count(self):
+        with self.read() as db:
+            return db.execute("SELECT COUNT(*) FROM attempts").fetchone()[0]
+
+    def gradable_attempts(self):
+        """Every attempt that recorded its questions and answers (for grading.py)."""
+        with self.read() as db:
+            rows = db.execute(
+                "SELECT id, subject, level, score, questions, answers FROM attempts "
+                "WHERE questions IS NOT NULL AND answers IS NOT NULL").fetchall()
+        return [_record(row) for row in rows]
+
+    def update_scores(self, scores):
+        """[(attempt row id, score)] in one transaction (re-grading only:
+        finished attempts are otherwise never modified)."""
+        with self.transaction() as db:
+            db.executemany("UPDATE attempts SET score = ? WHERE id = ?",
+                           [(score, row_id) for row_id, score in scores])
+
+    def export_csv(self, path):
+        """Every attempt in the old scores.csv layout (for spreadsheets)."""
+        with self.read() as db:
+            rows = db.execute(
+                "SELECT username, quiz_id, quiz_title, score, completed_at, suspicion_percent "
+                "FROM attempts ORDER BY completed_at").fetchall()
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["username", "quiz_id", "quiz_title", "score", "completed_at", "suspicion_percent"])
+            writer.writerows(tuple(row) for row in rows)
+        return len(rows)
+
+
+def _statements(script):
+    """Splits a migration script into statements (triggers contain ';')."""
+    statements, current = [], ""
+    for line in script.splitlines(keepends=True):
+        if line.strip().startswith("--"):
+            continue
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    return [s for s in statements if s]
+
+
+# ---------------------------------------------------------
+# PROCESS-WIDE STORE
+# ---------------------------------------------------------
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def shared_storage():
+    """The server's Storage, opened (and migrated) once per process."""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = Storage()
+        return _storage
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create/migrate the quiz database")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--export-csv", metavar="PATH", help="also write every attempt as CSV")
+    args = parser.parse_args(argv)
+
+    storage = Storage(args.db)
+    print(f"✅ {args.db}: {storage.user_count()} users, {storage.attempt_count()} attempts")
+    if args.export_csv:
+        print(f"✅ {storage.export_csv(args.export_csv)} attempts -> {args.export_csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,81 +1,54 @@
 import streamlit as st
-import subprocess
 import sys
 import os
-import time
-import signal
-
-from login import show_login_system
-from quiz import show_quiz_app
-from admin import show_admin_dashboard
 
 # ✅ PATH FIX
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, ".."))
+DETECTION_DIR = os.path.join(PROJECT_ROOT, "detection")
+if DETECTION_DIR not in sys.path:
+    sys.path.append(DETECTION_DIR)
 
-FACE_PATH = os.path.join(PROJECT_ROOT, "detection", "face.py")
-VOICE_PATH = os.path.join(PROJECT_ROOT, "detection", "voice.py")
+from login import show_login_system
+from quiz import show_quiz_app, suspicion_session, stop_monitoring
+from admin import show_admin_dashboard
+from suspicion import shared_service
+from launcher import shared_pool
 
-STOP_FILE = os.path.join(PROJECT_ROOT, "monitor_stop.flag")
+MONITOR_RETRY = 3   # seconds between attempts to get a warm monitor worker
 
 
 # ---------------------------------------------------------
 # HELPERS
 # ---------------------------------------------------------
 
-def _kill(proc):
-    if not proc:
-        return
-    try:
-        proc.terminate()
-        proc.wait(timeout=1)
-    except:
-        try:
-            proc.kill()
-        except:
-            pass
-
-
-def stop_monitoring():
-    # tell scripts to stop sitting loops
-    try:
-        with open(STOP_FILE, "w") as f:
-            f.write("stop")
-    except:
-        pass
-
-    time.sleep(0.5)
-
-    if "face_proc" in st.session_state:
-        _kill(st.session_state.face_proc)
-        del st.session_state.face_proc
-
-    if "voice_proc" in st.session_state:
-        _kill(st.session_state.voice_proc)
-        del st.session_state.voice_proc
-
-    if os.path.exists(STOP_FILE):
-        os.remove(STOP_FILE)
-
-
 def start_monitoring():
     stop_monitoring()
 
-    # Auto clean start
-    face_proc = subprocess.Popen([sys.executable, FACE_PATH])
-    voice_proc = subprocess.Popen([sys.executable, VOICE_PATH])
+    # ✅ Suspicion counts live in this process; the face monitor reports over a local socket
+    # (one counter session per username + attempt)
+    _, suspicion_addr = shared_service()
+
+    # face + voice in a pre-warmed worker (camera open, microphone calibrated);
+    # None when no worker is warm yet -- lease() waits LEASE_TIMEOUT at most
+    monitor = shared_pool().lease(
+        suspicion_session(), st.session_state.get("username", ""), suspicion_addr)
+    if monitor is not None:
+        st.session_state.monitor_proc = monitor
+    return monitor is not None
 
-    st.session_state.face_proc = face_proc
-    st.session_state.voice_proc = voice_proc
+
+# ✅ No warm worker free yet: retry in the background instead of blocking the page
+@st.fragment(run_every=MONITOR_RETRY)
+def monitoring_pending():
+    if monitoring_running() or start_monitoring():
+        st.rerun()  # full run: this fragment is no longer shown
+    st.info("⏳ Proctoring is starting up, monitoring will begin in a few seconds...")
 
 
 def monitoring_running():
-    p1 = st.session_state.get("face_proc")
-    p2 = st.session_state.get("voice_proc")
-    return (
-        p1 is not None and p1.poll() is None
-        and p2 is not None and p2.poll() is None
-    )
+    monitor = st.session_state.get("monitor_proc")
+    return monitor is not None and monitor.running()
 
 
 # ---------------------------------------------------------
@@ -84,6 +57,9 @@ def monitoring_running():
 
 def main():
 
+    # ✅ Monitor workers warm up while candidates log in
+    shared_pool()
+
     if "page" not in st.session_state:
         st.session_state.page = "login"
 
@@ -112,12 +88,17 @@ def main():
         show_quiz_app()
 
         # ✅ Auto start monitoring when first question appears
-        if st.session_state.get("quiz_started") and not monitoring_running():
-            start_monitoring()
+        if (st.session_state.get("quiz_started") and not st.session_state.get("quiz_completed")
+                and not monitoring_running()):
+            if not start_monitoring():
+                monitoring_pending()
 
-        # ✅ Stop monitoring when quiz completed
+        # ✅ Stop monitoring when quiz completed; the attempt (with its suspicion
+        # count) is saved by now, so its counter session and file can go
         if st.session_state.get("quiz_completed"):
             stop_monitoring()
+            counter, _ = shared_service()
+            counter.finish(suspicion_session())
 
         # ✅ Logout inside quiz.py
         if not st.session_state.get("logged_in"):
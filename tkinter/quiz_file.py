@@ -1,7 +1,7 @@
 from tkinter import *
 from tkinter import ttk, messagebox as tmsg, filedialog
 from datetime import datetime
-import os, json
+import os, json, sys
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 
@@ -32,6 +32,11 @@ QUIZ_DEFS = [
 
 USERS_FILE = "users.json"  # stored beside this script
 
+# compiled .qbank banks (python streamlit/qbank.py) are read instead of the .txt when up to date
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit"))
+from qbank import load_compiled
+from passwords import hash_password, verify_password
+
 # ===================== PATH HELPERS =======================
 def script_path(*parts):
     base = os.path.dirname(os.path.abspath(__file__))
@@ -59,11 +64,26 @@ def save_users(data):
 def ensure_default_admin():
     users = load_users()
     if "admin" not in users:
-        users["admin"] = {"password": "admin", "role": "admin"}
+        users["admin"] = {"password": hash_password("admin"), "role": "admin"}
+        save_users(users)
+
+def check_password(users, u, p):
+    # salted scrypt; plaintext entries from older versions are re-hashed on a good login
+    stored = users.get(u, {}).get("password")
+    if not stored:
+        return False
+    ok, new_hash = verify_password(p, stored)
+    if ok and new_hash:
+        users[u]["password"] = new_hash
         save_users(users)
+    return ok
 
 # ===================== QUIZ LOAD/SAVE =====================
 def load_quiz_from_file(filename):
+    compiled = load_compiled(filename)
+    if compiled is not None:
+        return compiled
+
     quiz_list = []
     try:
         with open(filename, "r", encoding="utf-8") as f:
@@ -255,7 +275,7 @@ class UserAuthFrame(Frame):
         u = self.u_var.get().strip()
         p = self.p_var.get()
         users = load_users()
-        if u in users and users[u].get("password") == p and users[u].get("role","user") == "user":
+        if check_password(users, u, p) and users[u].get("role","user") == "user":
             show_quiz_select(u)
         else:
             tmsg.showerror("Login Failed", "Invalid username or password (or not a user).")
@@ -274,7 +294,7 @@ class UserAuthFrame(Frame):
         if u in users:
             tmsg.showerror("Exists", "Username already exists.")
             return
-        users[u] = {"password": p, "role": "user"}
+        users[u] = {"password": hash_password(p), "role": "user"}
         save_users(users)
         tmsg.showinfo("Success", "Account created. You can log in now.")
         show_user_login()
@@ -311,7 +331,7 @@ class AdminLoginFrame(Frame):
         u = self.u_var.get().strip()
         p = self.p_var.get()
         users = load_users()
-        if u in users and users[u].get("password") == p and users[u].get("role") == "admin":
+        if check_password(users, u, p) and users[u].get("role") == "admin":
             show_admin_dashboard(u)
         else:
             tmsg.showerror("Login Failed", "Invalid admin credentials.")